@@ -1,38 +1,19 @@
-from functools import reduce
-import re
+from functools import lru_cache, reduce, wraps
+import os
+import threading
+import time
 
 import gradio as gr
+import numpy as np
 import pandas as pd
 
-from envs import REPO_ID
-from refresh import BOARDS_CONFIG, TASKS, TASKS_CONFIG, TASK_DESCRIPTIONS, PRETTY_NAMES, load_results, make_clickable_model
-from refresh import PROPRIETARY_MODELS, SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS, CROSS_ENCODERS, BI_ENCODERS, INSTRUCT_MODELS, NOINSTRUCT_MODELS, EXTERNAL_MODEL_TO_LINK
-
-
-PROPRIETARY_MODELS = {
-    make_clickable_model(model, link=EXTERNAL_MODEL_TO_LINK.get(model, f"https://huggingface.co/spaces/{REPO_ID}"))
-    for model in PROPRIETARY_MODELS
-}
-SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS = {
-    make_clickable_model(model, link=EXTERNAL_MODEL_TO_LINK.get(model, f"https://huggingface.co/spaces/{REPO_ID}"))
-    for model in SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS
-}
-INSTRUCT_MODELS = {
-    make_clickable_model(model, link=EXTERNAL_MODEL_TO_LINK.get(model, f"https://huggingface.co/spaces/{REPO_ID}"))
-    for model in INSTRUCT_MODELS
-}
-NOINSTRUCT_MODELS = {
-    make_clickable_model(model, link=EXTERNAL_MODEL_TO_LINK.get(model, f"https://huggingface.co/spaces/{REPO_ID}"))
-    for model in NOINSTRUCT_MODELS
-}
-CROSS_ENCODERS = {
-    make_clickable_model(model, link=EXTERNAL_MODEL_TO_LINK.get(model, f"https://huggingface.co/spaces/{REPO_ID}"))
-    for model in CROSS_ENCODERS
-}
-BI_ENCODERS = {
-    make_clickable_model(model, link=EXTERNAL_MODEL_TO_LINK.get(model, f"https://huggingface.co/spaces/{REPO_ID}"))
-    for model in BI_ENCODERS
-}
+from envs import FILTER_CACHE_SIZE, FILTER_CONCURRENCY_LIMIT, PAGE_SIZE, PAGINATE, QUEUE_MAX_SIZE, RELOAD_INTERVAL, SERVE_API, SNAPSHOT_PATH, UI_CONCURRENCY_LIMIT
+from refresh import BOARDS_CONFIG, TASKS, TASKS_CONFIG, TASK_DESCRIPTIONS, PRETTY_NAMES, MODEL_TYPE_FLAGS, load_leaderboard_results
+from utils.search_index import build_search_index, get_model_name, get_search_mask, search_names
+from utils.snapshot import get_snapshot_version
+from utils.table_api import build_api_blobs, create_api_router
+from utils.table_format import SCORE_DECIMALS, format_table
+from utils.worker_pool import get_pool_metrics, get_queue_metrics, make_pool, run_in_pool, track_queue_waits
 
 
 def make_datasets_clickable(df):
@@ -91,8 +72,9 @@ Each inner tab can have the following keys:
 
 # load in the pre-calculated `all_data_tasks` and `boards_data`
 print(f"Loading pre-calculated data....")
-all_data_tasks = load_results("all_data_tasks")
-boards_data = load_results("boards_data")
+# Without snapshot, the results are read from the legacy folders
+snapshot_version = get_snapshot_version(SNAPSHOT_PATH) or "legacy"
+all_data_tasks, boards_data, model_flags = load_leaderboard_results()
 
 #### Caclulate Metadata
 # Exact, add all non-nan integer values for every dataset
@@ -145,6 +127,8 @@ for board, board_config in BOARDS_CONFIG.items():
             "language_long": board_config["language_long"],
             "description": f"**Overall MTEB {overall_pretty_name}** 🔮{board_icon}",
             "data": boards_data[board]["data_overall"],
+            "board": board,
+            "table": "overall",
             # "refresh": get_refresh_overall_function(board_config["tasks"]),
             "credits": credits,
             "metric": metric,
@@ -159,6 +143,8 @@ for board, board_config in BOARDS_CONFIG.items():
             "language_long": board_config["language_long"],
             "description": f"**{task_category} {board_pretty_name}** {task_icon}{board_icon}",
             "data": boards_data[board]["data_tasks"][task_category],
+            "board": board,
+            "table": task_category,
             # "refresh": get_refresh_function(task_category, task_category_list),
             "credits": credits,
             "metric": metric,
@@ -166,8 +152,19 @@ for board, board_config in BOARDS_CONFIG.items():
         })
 
 dataframes = []
-full_dataframes = []
 tabs = []
+# The full tables stay on the server (see `build_state`), keyed by (task tab id, language tab id) in the same order
+# as `dataframes`: a table is only sent to the browser, filtered, when its tab is selected or the filters change
+TABLE_KEYS = []
+# Board and table name (as in `get_board_table`) of every table key
+TABLE_SOURCES = {}
+for task, task_values in data.items():
+    for item in task_values["data"]:
+        table_key = (task.lower().replace(" ", "-"), item["language"].lower().replace(" ", "-"))
+        TABLE_KEYS.append(table_key)
+        TABLE_SOURCES[table_key] = (item["board"], item["table"])
+# Select events of the tabs, on which the selected table is rendered once all the tables are created
+tab_select_events = []
 
 # The following JavaScript function updates the URL parameters based on the selected task and language
 # Additionally, `update_url_task` and `update_url_language` are used to update the current task and language
@@ -221,48 +218,248 @@ MODEL_TYPES = [
     "No Instructions",
 ]
 
-def filter_data(search_query, model_types, model_sizes, *full_dataframes):
-    output_dataframes = []
-    for df in full_dataframes:
-        # Apply the search query
-        if search_query:
-            names = df["Model"].map(lambda x: re.match("<a .+?>(.+)</a>", x).group(1))
-            masks = []
-            for query in search_query.split(";"):
-                masks.append(names.str.lower().str.contains(query.lower()))
-            df = df[reduce(lambda a, b: a | b, masks)]
-
-        # Apply the model type filtering
-        if set(model_types) != set(MODEL_TYPES):
-            masks = []
-            for model_type in model_types:
-                if model_type == "Open":
-                    masks.append(~df["Model"].isin(PROPRIETARY_MODELS))
-                elif model_type == "Proprietary":
-                    masks.append(df["Model"].isin(PROPRIETARY_MODELS))
-                elif model_type == "Sentence Transformers":
-                    masks.append(df["Model"].isin(SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS))
-                elif model_type == "Cross-Encoders":
-                    masks.append(df["Model"].isin(CROSS_ENCODERS))
-                elif model_type == "Bi-Encoders":
-                    masks.append(df["Model"].isin(BI_ENCODERS))
-                elif model_type == "Uses Instructions":
-                    masks.append(df["Model"].isin(INSTRUCT_MODELS))
-                elif model_type == "No Instructions":
-                    masks.append(df["Model"].isin(NOINSTRUCT_MODELS))
-            if masks:
-                df = df[reduce(lambda a, b: a | b, masks)]
-            else:
-                df = pd.DataFrame(columns=df.columns)
+# Edges of the (right-closed) NUMERIC_INTERVALS, to find the interval of every model size with `np.searchsorted`
+SIZE_BIN_EDGES = np.array([interval.left for interval in NUMERIC_INTERVALS.values()][:1] + [interval.right for interval in NUMERIC_INTERVALS.values()])
+SIZE_BIN_NAMES = list(NUMERIC_INTERVALS.keys())
+
+def get_table_sizes(df: pd.DataFrame) -> dict:
+    """Get the numeric sizes (NaN if unknown) of the models of a table and their index in NUMERIC_INTERVALS (-1 if none)."""
+    # The float32 columns are rounded back to the values of the results (e.g. 26.08, not 26.0799999237), the filters
+    # compare them to the bounds typed by the users
+    params = np.round(df["Model Size (Million Parameters)"].to_numpy(dtype=np.float64), SCORE_DECIMALS)
+    memory = np.round(df["Memory Usage (GB, fp32)"].to_numpy(dtype=np.float64), SCORE_DECIMALS)
+    size_bins = np.searchsorted(SIZE_BIN_EDGES, params, side="left") - 1
+    size_bins[np.isnan(params) | (size_bins < 0) | (size_bins >= len(SIZE_BIN_NAMES))] = -1
+    return {"params": params, "memory": memory, "size_bins": size_bins}
+
+def get_table_flags(df: pd.DataFrame, model_to_flags: dict) -> np.ndarray:
+    """Get the model types (bitmasks of MODEL_TYPE_FLAGS, 0 if unknown) of the models of a table."""
+    return np.fromiter((model_to_flags.get(model, 0) for model in df["Model"]), dtype="int64", count=len(df))
+
+def get_board_table(boards_data: dict, board: str, table: str) -> pd.DataFrame:
+    if table == "overall":
+        return boards_data[board]["data_overall"]
+    return boards_data[board]["data_tasks"][table]
+
+def build_state(version: str, boards_data: dict, model_flags: pd.DataFrame, build_api: bool = SERVE_API) -> dict:
+    """
+    Build everything the requests read from the results: the tables of `TABLE_SOURCES`, their model sizes and model
+    types (as bitmasks of MODEL_TYPE_FLAGS), the search index and the compressed responses of the API.
+    """
+    tables = {table_key: get_board_table(boards_data, *source) for table_key, source in TABLE_SOURCES.items()}
+    model_to_flags = dict(zip(model_flags["Model"], model_flags["Flags"]))
+    return {
+        "version": version,
+        "tables": tables,
+        "table_sizes": {table_key: get_table_sizes(df) for table_key, df in tables.items()},
+        "search_index": build_search_index(list(tables.values())),
+        "table_flags": {table_key: get_table_flags(df, model_to_flags) for table_key, df in tables.items()},
+        "api_blobs": build_api_blobs(boards_data, version) if build_api else None,
+    }
+
+# The state of the current results and of the previous ones: a new snapshot is loaded in the background (see
+# `watch_snapshot`) and swapped in at once. A request gets the current version once and reads the state of that
+# version until it finishes, so the requests started before a swap end with the previous results.
+STATE = None
+PREVIOUS_STATE = None
+
+def resolve_version(version: str = None) -> str:
+    """Get the version of the results a request reads: the requested one if it is still loaded, else the current one."""
+    state, previous_state = STATE, PREVIOUS_STATE
+    if previous_state is not None and version == previous_state["version"]:
+        return version
+    return state["version"]
+
+def get_state(version: str = None) -> dict:
+    """
+    Get the state of a loaded version of the results (see `resolve_version`). The caches are keyed by version, so an
+    unknown version is an error rather than the current results cached under the wrong version.
+    """
+    state, previous_state = STATE, PREVIOUS_STATE
+    if version is None or version == state["version"]:
+        return state
+    if previous_state is not None and version == previous_state["version"]:
+        return previous_state
+    raise gr.Error(f"The results version {version} is not loaded anymore, please reload the page.")
+
+def swap_state(state: dict) -> None:
+    global STATE, PREVIOUS_STATE
+    PREVIOUS_STATE, STATE = STATE, state
+    # The caches are keyed by version, the entries of the older versions are not used anymore
+    clear_filter_cache()
+
+STATE = build_state(snapshot_version, boards_data, model_flags)
+
+DEFAULT_FILTER_STATE = {
+    "search_query": "",
+    "model_types": MODEL_TYPES,
+    "model_sizes": list(NUMERIC_INTERVALS.keys()),
+    "size_range": (None, None),
+    "memory_range": (None, None),
+}
+
+def normalize_filters(search_query, model_types, model_sizes, size_range=(None, None), memory_range=(None, None)) -> tuple:
+    """Normalize the filters so that equivalent ones get the same key, e.g. for the filter cache."""
+    # The queries separated by `;` are OR-ed and case-insensitive, their order does not matter
+    search_queries = tuple(sorted(set(search_query.lower().split(";")))) if search_query else ()
+    return search_queries, frozenset(model_types), frozenset(model_sizes), tuple(size_range), tuple(memory_range)
+
+# With `PAGINATE`, the selected table is sorted and sliced on the server, only the visible page is sent
+DEFAULT_SORT = "Default (ranking)"
+DEFAULT_PAGE_STATE = {
+    "sort_by": None,
+    "ascending": False,
+    "page": 1,
+}
 
-        # Apply the model size filtering
-        if set(model_sizes) != set(NUMERIC_INTERVALS.keys()):
-            numeric_interval = pd.IntervalIndex(sorted([NUMERIC_INTERVALS[model_size] for model_size in model_sizes]))
-            sizes = df["Model Size (Million Parameters)"].replace('', 0)
-            mask = sizes.apply(lambda size: any(numeric_interval.contains(size)))
-            df = df[mask]
-        output_dataframes.append(df)
-    return output_dataframes
+def get_filter_key(filter_state: dict) -> tuple:
+    return normalize_filters(**{key: filter_state[key] for key in DEFAULT_FILTER_STATE})
+
+def get_render_key(version: str, filter_state: dict) -> tuple:
+    """Key of what is sent for a table: the version of the results, its filters, and its sort and page if paginated."""
+    if not PAGINATE:
+        return (version,) + get_filter_key(filter_state)
+    return (version,) + get_filter_key(filter_state) + (filter_state["sort_by"], filter_state["ascending"], filter_state["page"])
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def get_name_matches(version: str, search_queries: tuple):
+    return search_names(get_state(version)["search_index"], ";".join(search_queries))
+
+def get_range_mask(values: np.ndarray, value_range: tuple) -> np.ndarray:
+    """Models with an unknown value are filtered out as soon as there is a bound."""
+    min_value, max_value = value_range
+    mask = np.ones(len(values), dtype=bool)
+    if min_value is not None:
+        mask &= values >= min_value
+    if max_value is not None:
+        mask &= values <= max_value
+    return mask
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def get_filter_mask(version: str, table_key: tuple, search_queries: tuple, model_types: frozenset, model_sizes: frozenset, size_range: tuple, memory_range: tuple) -> np.ndarray:
+    """Get which rows of a table pass normalized filters (see `normalize_filters`). The results are cached."""
+    state = get_state(version)
+    df = state["tables"][table_key]
+    sizes = state["table_sizes"][table_key]
+    mask = np.ones(len(df), dtype=bool)
+    # Apply the search query
+    if search_queries:
+        # The names matching the query are found once in the index, not in every table
+        name_matches = get_name_matches(version, search_queries)
+        mask &= get_search_mask(state["search_index"], ";".join(search_queries), name_matches, df["Model"])
+
+    # Apply the model type filtering
+    if model_types != set(MODEL_TYPES):
+        if not model_types:
+            return np.zeros(len(df), dtype=bool)
+        flags = state["table_flags"][table_key]
+        # A model is kept if it has any of the selected types
+        type_flags = reduce(lambda a, b: a | b, [MODEL_TYPE_FLAGS[t] for t in model_types if t != "Open"], 0)
+        type_mask = (flags & type_flags) != 0
+        if "Open" in model_types:
+            type_mask |= (flags & MODEL_TYPE_FLAGS["Proprietary"]) == 0
+        mask &= type_mask
+
+    # Apply the model size filtering
+    if model_sizes != set(NUMERIC_INTERVALS.keys()):
+        selected_bins = np.array([SIZE_BIN_NAMES.index(model_size) for model_size in model_sizes], dtype=int)
+        mask &= np.isin(sizes["size_bins"], selected_bins)
+    mask &= get_range_mask(sizes["params"], size_range)
+    mask &= get_range_mask(sizes["memory"], memory_range)
+    return mask
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def filter_table(version: str, table_key: tuple, *filters) -> pd.DataFrame:
+    """Filter one table, with normalized filters (see `normalize_filters`). The results are cached."""
+    df = get_state(version)["tables"][table_key]
+    model_types = filters[1]
+    if not model_types:
+        return pd.DataFrame(columns=df.columns)
+    mask = get_filter_mask(version, table_key, *filters)
+    return df if mask.all() else df[mask]
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def get_sort_order(version: str, table_key: tuple, sort_by: str, ascending: bool) -> np.ndarray:
+    """
+    Get the row positions of a table sorted by a column, with the missing values last. Without column, this is the
+    order of the table, i.e. the ranking of `add_rank`. The results are cached.
+    """
+    df = get_state(version)["tables"][table_key]
+    if sort_by is None or sort_by not in df.columns:
+        return np.arange(len(df))
+    if sort_by == "Model":
+        values = pd.Series([get_model_name(model) for model in df["Model"]])
+    else:
+        values = df[sort_by].reset_index(drop=True)
+        if values.dtype == object:
+            # "Max Tokens" mixes numbers and "N/A", which is sorted with the missing values
+            values = pd.to_numeric(values, errors="coerce")
+    return values.sort_values(ascending=ascending, kind="stable", na_position="last").index.to_numpy()
+
+def get_table_page(version: str, table_key: tuple, filters: tuple, sort_by: str, ascending: bool, page: int) -> tuple:
+    """Get a page (starting at 1) of a filtered and sorted table, with the page number and the number of pages and rows."""
+    positions = get_sort_order(version, table_key, sort_by, ascending)
+    positions = positions[get_filter_mask(version, table_key, *filters)[positions]]
+    num_pages = max(1, -(-len(positions) // PAGE_SIZE))
+    page = min(max(page, 1), num_pages)
+    df = get_state(version)["tables"][table_key].iloc[positions[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]]
+    return df, page, num_pages, len(positions)
+
+def clear_filter_cache():
+    """To call when the tables change, e.g. when a new snapshot is loaded."""
+    filter_table.cache_clear()
+    get_filter_mask.cache_clear()
+    get_sort_order.cache_clear()
+    get_name_matches.cache_clear()
+
+def filter_data(search_query, model_types, model_sizes, *table_keys, size_range=(None, None), memory_range=(None, None), version=None):
+    """Filter the tables with the given keys, of the given version of the results or of the current one."""
+    version = resolve_version(version)
+    filters = normalize_filters(search_query, model_types, model_sizes, size_range, memory_range)
+    return [filter_table(version, table_key, *filters) for table_key in table_keys]
+
+# The handlers filtering or sorting the tables run in their own concurrency group of the Gradio queue and in their own
+# threads, so that they do not hold up the cheap handlers (URL updates, tabs on load) and are measured apart
+UI_EVENT = {"concurrency_id": "ui", "concurrency_limit": UI_CONCURRENCY_LIMIT}
+FILTER_EVENT = {"concurrency_id": "filter", "concurrency_limit": FILTER_CONCURRENCY_LIMIT}
+FILTER_POOL = make_pool("filter", FILTER_CONCURRENCY_LIMIT)
+
+def in_filter_pool(fn):
+    """Run an event handler in `FILTER_POOL`."""
+    @wraps(fn)
+    async def run(*args):
+        # The wait in the Gradio queue is measured by `track_queue_waits`, the wait for a thread of the pool and the
+        # run time here, per handler
+        return await run_in_pool(FILTER_POOL, fn, *args, name=fn.__name__)
+    return run
+
+def get_metrics() -> dict:
+    """Queue and worker metrics of the app, to size the deployment."""
+    return {
+        "version": STATE["version"],
+        "queue": get_queue_metrics(block),
+        "filter_pool": get_pool_metrics(FILTER_POOL),
+        "filter_cache": filter_table.cache_info()._asdict(),
+        "filter_mask_cache": get_filter_mask.cache_info()._asdict(),
+    }
+
+def watch_snapshot():
+    """Load the new snapshots written to SNAPSHOT_PATH (e.g. by refresh.py) in the background, and swap them in."""
+    while True:
+        time.sleep(RELOAD_INTERVAL)
+        try:
+            version = get_snapshot_version(SNAPSHOT_PATH)
+            if version is None or version == STATE["version"]:
+                continue
+            print(f"Loading snapshot {version}...")
+            _, new_boards_data, new_model_flags = load_leaderboard_results()
+            # The snapshot was replaced again while loading, the next check loads the new one
+            if get_snapshot_version(SNAPSHOT_PATH) != version:
+                continue
+            swap_state(build_state(version, new_boards_data, new_model_flags))
+            print(f"Loaded snapshot {version}")
+        except Exception as e:
+            print(f"Failed to load the new snapshot: {e}")
 
 
 with gr.Blocks(css=css) as block:
@@ -271,6 +468,11 @@ with gr.Blocks(css=css) as block:
     # for passing the current task and language to the JavaScript function via Gradio
     current_task_language = gr.JSON(value=dict(), visible=False)
     language_per_task = gr.JSON(value=dict(), visible=False)
+    # Last filters applied (the search query is only applied on submit), used to filter the tables of the other tabs
+    # when they get selected
+    filter_state = gr.State({**DEFAULT_FILTER_STATE, **DEFAULT_PAGE_STATE})
+    # Keys of the tables sent to this browser session, with the filters they were sent with
+    rendered_tables = gr.State(dict())
 
     gr.Markdown(f"""
     Massive Text Embedding Benchmark (MTEB) Leaderboard. To submit, refer to the <a href="https://github.com/embeddings-benchmark/mteb/blob/main/docs/adding_a_model.md" target="_blank" style="text-decoration: underline">MTEB GitHub repository</a> 🤗 Refer to the [MTEB paper](https://arxiv.org/abs/2210.07316) for details on metrics, tasks and models. Also check out [MTEB Arena](https://huggingface.co/spaces/mteb/arena) ⚔️
@@ -297,6 +499,23 @@ with gr.Blocks(css=css) as block:
             elem_classes=["filter-checkbox-group"],
             scale=2,
         )
+    # Free-form ranges, applied on top of the size intervals above. Models of unknown size are hidden by any bound.
+    with gr.Row():
+        filter_min_size = gr.Number(label="Min. parameters (Million)", value=None, minimum=0)
+        filter_max_size = gr.Number(label="Max. parameters (Million)", value=None, minimum=0)
+        filter_min_memory = gr.Number(label="Min. memory usage (GB, fp32)", value=None, minimum=0)
+        filter_max_memory = gr.Number(label="Max. memory usage (GB, fp32)", value=None, minimum=0)
+    # Sort and page of the selected table, see `render_selected_table`
+    pagination_outputs = []
+    if PAGINATE:
+        with gr.Row():
+            sort_by = gr.Dropdown(label="Sort by", choices=[DEFAULT_SORT], value=DEFAULT_SORT, interactive=True, scale=3)
+            sort_order = gr.Radio(label="Order", choices=["Descending", "Ascending"], value="Descending", interactive=True, scale=2)
+            previous_page = gr.Button("Previous", scale=1)
+            page_number = gr.Number(label="Page", value=1, minimum=1, precision=0, interactive=True, scale=1)
+            next_page = gr.Button("Next", scale=1)
+            page_info = gr.Markdown()
+        pagination_outputs = [sort_by, page_number, page_info]
 
     with gr.Tabs() as outer_tabs:
         # Store the tabs for updating them on load based on URL parameters
@@ -309,7 +528,7 @@ with gr.Blocks(css=css) as block:
             pretty_task_name = task if task not in PRETTY_NAMES.keys() else PRETTY_NAMES[task]
             with gr.Tab(pretty_task_name, id=task_tab_id) as task_tab:
                 # For updating the 'task' in the URL
-                task_tab.select(update_url_task, [current_task_language, language_per_task], [current_task_language, language_per_task]).then(None, [current_task_language], [], js=set_window_url_params)
+                tab_select_events.append(task_tab.select(update_url_task, [current_task_language, language_per_task], [current_task_language, language_per_task], **UI_EVENT).then(None, [current_task_language], [], js=set_window_url_params))
                 if "Overall" != task:
                     gr.Markdown(TASK_DESCRIPTIONS[task])
                 with gr.Tabs() as task_tabs:
@@ -322,7 +541,7 @@ with gr.Blocks(css=css) as block:
                         # English, Chinese, French, etc.
                         with gr.Tab(item["language"], id=item_tab_id) as item_tab:
                             # For updating the 'language' in the URL
-                            item_tab.select(update_url_language, [current_task_language, language_per_task], [current_task_language, language_per_task], trigger_mode="always_last").then(None, [current_task_language], [], js=set_window_url_params)
+                            tab_select_events.append(item_tab.select(update_url_language, [current_task_language, language_per_task], [current_task_language, language_per_task], trigger_mode="always_last", **UI_EVENT).then(None, [current_task_language], [], js=set_window_url_params))
 
                             specific_metric = metric
                             if item.get("metric", None) is not None:
@@ -340,12 +559,11 @@ with gr.Blocks(css=css) as block:
 
                             with gr.Row():
                                 datatype = ["number", "markdown"] + ["number"] * len(item["data"])
-                                dataframe = gr.Dataframe(item["data"], datatype=datatype, type="pandas", height=500)
+                                # Only the headers until the tab is selected, see `render_selected_table`
+                                empty_data = format_table(item["data"].iloc[:0])
+                                dataframe = gr.Dataframe(empty_data, datatype=datatype, type="pandas", height=500)
                                 dataframes.append(dataframe)
 
-                                full_dataframe = gr.Dataframe(item["data"], datatype=datatype, type="pandas", visible=False)
-                                full_dataframes.append(full_dataframe)
-
                             # with gr.Row():
                             #     refresh_button = gr.Button("Refresh")
                             #     refresh_button.click(item["refresh"], inputs=None, outputs=dataframe, concurrency_limit=20)
@@ -355,7 +573,10 @@ with gr.Blocks(css=css) as block:
     - **Total Languages**: 113
     - **Total Scores**: {NUM_SCORES}
     - **Total Models**: {NUM_MODELS}
-    """ + r"""
+    """)
+    # Version of the results of the last table sent, which changes when a new snapshot is loaded
+    results_version = gr.Markdown(f"Results version: `{STATE['version']}`")
+    gr.Markdown(r"""
     Made with ❤️ for NLP. If this work is useful to you, please consider citing:
 
     ```bibtex
@@ -390,14 +611,144 @@ with gr.Blocks(css=css) as block:
         language_per_task = {task_key: language_key}
         return return_tabs + [current_task_language, language_per_task]
 
-    block.load(set_tabs_on_load, inputs=[], outputs=tabs + [current_task_language, language_per_task])
-
-    search_bar.submit(filter_data, inputs=[search_bar, filter_model_type, filter_model_sizes] + full_dataframes, outputs=dataframes)
-    filter_model_type.change(filter_data, inputs=[search_bar, filter_model_type, filter_model_sizes] + full_dataframes, outputs=dataframes)
-    filter_model_sizes.change(filter_data, inputs=[search_bar, filter_model_type, filter_model_sizes] + full_dataframes, outputs=dataframes)
+    def get_selected_table_key(current_task_language: dict):
+        """Get the key in `TABLE_KEYS` of the table shown for the selected task and language."""
+        task_key = current_task_language.get("task", "overall")
+        language_key = current_task_language.get("language")
+        if (task_key, language_key) in TABLE_SOURCES:
+            return (task_key, language_key)
+        # Unknown language (e.g. from the URL), the first language tab of the task is shown
+        return next((key for key in TABLE_KEYS if key[0] == task_key), None)
+
+    def render_selected_table(current_task_language, rendered_tables, filter_state):
+        """Send the table of the selected tab (only its page if paginated) if it was not sent yet with the current filters."""
+        updates = [gr.update()] * len(dataframes)
+        pagination_updates = [gr.update()] * len(pagination_outputs)
+        # The whole request reads this version of the results, even if a new one is swapped in meanwhile
+        version = resolve_version()
+        key = get_selected_table_key(current_task_language)
+        if key is None:
+            return updates + [rendered_tables, gr.update()] + pagination_updates
+        render_key = get_render_key(version, filter_state)
+        if PAGINATE:
+            df, page, num_pages, num_rows = get_table_page(
+                version, key, get_filter_key(filter_state), filter_state["sort_by"], filter_state["ascending"], filter_state["page"]
+            )
+            columns = get_state(version)["tables"][key].columns
+            pagination_updates = [
+                gr.update(choices=[DEFAULT_SORT] + list(columns), value=filter_state["sort_by"] or DEFAULT_SORT),
+                gr.update(value=page),
+                f"Page {page} of {num_pages} ({num_rows} rows)",
+            ]
+        if rendered_tables.get(key) != render_key:
+            idx = TABLE_KEYS.index(key)
+            # The tables are only formatted (rounded, "" for the missing scores) to be sent
+            if PAGINATE:
+                updates[idx] = format_table(df)
+            else:
+                updates[idx] = format_table(filter_data(
+                    filter_state["search_query"],
+                    filter_state["model_types"],
+                    filter_state["model_sizes"],
+                    key,
+                    size_range=filter_state["size_range"],
+                    memory_range=filter_state["memory_range"],
+                    version=version,
+                )[0])
+            rendered_tables = {**rendered_tables, key: render_key}
+        return updates + [rendered_tables, f"Results version: `{version}`"] + pagination_updates
+
+    def select_table(current_task_language, rendered_tables, filter_state):
+        """Render the table of a newly selected tab, from its first page."""
+        filter_state = {**filter_state, "page": 1}
+        return [filter_state] + render_selected_table(current_task_language, rendered_tables, filter_state)
+
+    def update_filters(search_query, model_types, model_sizes, min_size, max_size, min_memory, max_memory, current_task_language, rendered_tables, filter_state):
+        """Save the new filters and only apply them to the selected table, the others are filtered when selected."""
+        filter_state = {
+            **filter_state,
+            "search_query": search_query,
+            "model_types": model_types,
+            "model_sizes": model_sizes,
+            "size_range": (min_size, max_size),
+            "memory_range": (min_memory, max_memory),
+            "page": 1,
+        }
+        return [filter_state] + render_selected_table(current_task_language, rendered_tables, filter_state)
+
+    def update_sort(sort_by, sort_order, current_task_language, rendered_tables, filter_state):
+        """Sort the selected table by another column, from its first page."""
+        filter_state = {
+            **filter_state,
+            "sort_by": None if sort_by == DEFAULT_SORT else sort_by,
+            "ascending": sort_order == "Ascending",
+            "page": 1,
+        }
+        return [filter_state] + render_selected_table(current_task_language, rendered_tables, filter_state)
+
+    def update_page(page, current_task_language, rendered_tables, filter_state):
+        """Show another page of the selected table, the page number is clamped to the existing pages."""
+        filter_state = {**filter_state, "page": int(page or 1)}
+        key = get_selected_table_key(current_task_language)
+        if key is not None:
+            filter_state["page"] = get_table_page(
+                resolve_version(), key, get_filter_key(filter_state), filter_state["sort_by"], filter_state["ascending"], filter_state["page"]
+            )[1]
+        return [filter_state] + render_selected_table(current_task_language, rendered_tables, filter_state)
+
+    render_outputs = [filter_state] + dataframes + [rendered_tables, results_version] + pagination_outputs
+    # Only the table of the initial tab is rendered eagerly
+    block.load(set_tabs_on_load, inputs=[], outputs=tabs + [current_task_language, language_per_task], **UI_EVENT).then(
+        in_filter_pool(select_table),
+        inputs=[current_task_language, rendered_tables, filter_state],
+        outputs=render_outputs,
+        **FILTER_EVENT,
+    )
+    for tab_select_event in tab_select_events:
+        tab_select_event.then(
+            in_filter_pool(select_table),
+            inputs=[current_task_language, rendered_tables, filter_state],
+            outputs=render_outputs,
+            **FILTER_EVENT,
+        )
 
-block.queue(max_size=10)
-block.launch()
+    filter_inputs = [search_bar, filter_model_type, filter_model_sizes, filter_min_size, filter_max_size, filter_min_memory, filter_max_memory, current_task_language, rendered_tables, filter_state]
+    search_bar.submit(in_filter_pool(update_filters), inputs=filter_inputs, outputs=render_outputs, **FILTER_EVENT)
+    filter_model_type.change(in_filter_pool(update_filters), inputs=filter_inputs, outputs=render_outputs, **FILTER_EVENT)
+    filter_model_sizes.change(in_filter_pool(update_filters), inputs=filter_inputs, outputs=render_outputs, **FILTER_EVENT)
+    for filter_range in [filter_min_size, filter_max_size, filter_min_memory, filter_max_memory]:
+        filter_range.change(in_filter_pool(update_filters), inputs=filter_inputs, outputs=render_outputs, trigger_mode="always_last", **FILTER_EVENT)
+
+    if PAGINATE:
+        # `input` and not `change`, which would also be triggered by the updates of `render_selected_table`
+        sort_inputs = [sort_by, sort_order, current_task_language, rendered_tables, filter_state]
+        sort_by.input(in_filter_pool(update_sort), inputs=sort_inputs, outputs=render_outputs, **FILTER_EVENT)
+        sort_order.input(in_filter_pool(update_sort), inputs=sort_inputs, outputs=render_outputs, **FILTER_EVENT)
+        page_inputs = [current_task_language, rendered_tables, filter_state]
+        page_number.submit(in_filter_pool(update_page), inputs=[page_number] + page_inputs, outputs=render_outputs, **FILTER_EVENT)
+        previous_page.click(in_filter_pool(lambda *args: update_page(args[-1]["page"] - 1, *args)), inputs=page_inputs, outputs=render_outputs, **FILTER_EVENT)
+        next_page.click(in_filter_pool(lambda *args: update_page(args[-1]["page"] + 1, *args)), inputs=page_inputs, outputs=render_outputs, **FILTER_EVENT)
+
+if __name__ == "__main__":
+    if RELOAD_INTERVAL > 0:
+        threading.Thread(target=watch_snapshot, daemon=True).start()
+    block.queue(max_size=QUEUE_MAX_SIZE, default_concurrency_limit=UI_CONCURRENCY_LIMIT)
+    import uvicorn
+    from fastapi import FastAPI
+
+    # The routes of the server are matched before the app, mounted at the root
+    server = FastAPI()
+    server.get("/api/metrics")(get_metrics)
+    if SERVE_API:
+        server.include_router(create_api_router(lambda: STATE["api_blobs"]))
+    server = gr.mount_gradio_app(server, block, path="/")
+    if not track_queue_waits(block):
+        print("The queue of this Gradio version can't be tracked, /api/metrics has no queue wait times")
+    uvicorn.run(
+        server,
+        host=os.environ.get("GRADIO_SERVER_NAME", "127.0.0.1"),
+        port=int(os.environ.get("GRADIO_SERVER_PORT", 7860)),
+    )
 
 # Add model names here so the mteb/leaderboard space shows up on their model page
 # from envs import MODEL_META
@@ -0,0 +1,308 @@
+"""
+Benchmarks of the compute and serving hot paths of the leaderboard on synthetic leaderboards
+
+Every benchmark is timed (best of `--repeat` runs) and its peak memory is measured with tracemalloc. The results are
+    written as JSON so that they can be compared between commits:
+
+    python benchmark.py --output bench_main.json
+    python benchmark.py --baseline bench_main.json --max-slowdown 1.25
+
+With `--baseline`, the script exits with a non-zero code if any benchmark got slower (or used more memory) than the
+    configured thresholds.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from refresh import TASK_TO_METRIC, TASKS, add_rank, get_model_flags, get_mteb_average, load_results, make_clickable_model, write_out_results
+from utils.snapshot import load_snapshot, write_snapshot
+
+BASE_COLUMNS = [
+    "Model",
+    "Model Size (Million Parameters)",
+    "Memory Usage (GB, fp32)",
+    "Embedding Dimensions",
+    "Max Tokens",
+]
+# Task categories used for the synthetic boards
+TASK_CATEGORIES = [task for task in TASKS if task not in ("MultilabelClassification", "InstructionRetrieval")]
+
+
+def parse_size(size: str) -> tuple[int, int]:
+    num_models, num_datasets = size.lower().split("x")
+    return int(num_models), int(num_datasets)
+
+
+def get_task_dict(num_datasets: int) -> dict:
+    # Zero-padded names, so that no dataset name is a substring of another one
+    datasets = [f"SyntheticDataset{i:05d}" for i in range(num_datasets)]
+    return {
+        task_category: datasets[i :: len(TASK_CATEGORIES)]
+        for i, task_category in enumerate(TASK_CATEGORIES)
+        if datasets[i :: len(TASK_CATEGORIES)]
+    }
+
+
+def make_model_columns(num_models: int, rng: np.random.Generator) -> dict:
+    sizes = rng.integers(10, 10_000, num_models).astype(float)
+    sizes[rng.random(num_models) < 0.1] = np.nan
+    return {
+        "Model": [make_clickable_model(f"org{i % 100}/synthetic-model-{i}") for i in range(num_models)],
+        "Model Size (Million Parameters)": sizes,
+        "Memory Usage (GB, fp32)": np.round(sizes * 1e6 * 4 / 1024**3, 2),
+        "Embedding Dimensions": rng.choice([384, 768, 1024, 4096], num_models),
+        "Max Tokens": rng.choice([512, 8192, 32768], num_models),
+    }
+
+
+def make_scores(num_models: int, num_datasets: int, density: float, rng: np.random.Generator) -> np.ndarray:
+    scores = np.round(rng.random((num_models, num_datasets)) * 100, 2)
+    scores[rng.random((num_models, num_datasets)) > density] = np.nan
+    return scores
+
+
+def make_table(num_models: int, num_datasets: int, density: float, seed: int) -> pd.DataFrame:
+    """A wide leaderboard table (model columns + one score column per dataset), as produced by `get_mteb_data`"""
+    rng = np.random.default_rng(seed)
+    task_dict = get_task_dict(num_datasets)
+    datasets = [dataset for task_list in task_dict.values() for dataset in task_list]
+    scores = make_scores(num_models, num_datasets, density, rng)
+    df = pd.DataFrame(make_model_columns(num_models, rng))
+    return pd.concat([df, pd.DataFrame(scores, columns=datasets)], axis=1)
+
+
+def make_results_store(num_models: int, num_datasets: int, density: float, seed: int) -> dict:
+    """A results store (see `refresh.build_results_store`) with the scores of `make_table` as external results"""
+    rng = np.random.default_rng(seed)
+    task_dict = get_task_dict(num_datasets)
+    dataset_to_task = {dataset: task for task, task_list in task_dict.items() for dataset in task_list}
+    datasets = list(dataset_to_task)
+    scores = make_scores(num_models, num_datasets, density, rng)
+    model_columns = make_model_columns(num_models, rng)
+
+    model_idx, dataset_idx = np.nonzero(~np.isnan(scores))
+    tasks = np.array([dataset_to_task[dataset] for dataset in datasets], dtype=object)[dataset_idx]
+    model_ids = np.array([f"synthetic-model-{i}" for i in range(num_models)], dtype=object)
+    scores_df = pd.DataFrame(
+        {
+            "model_id": model_ids[model_idx],
+            "source": "external",
+            "task": tasks,
+            "dataset": np.array(datasets, dtype=object)[dataset_idx],
+            "dataset_name": np.array(datasets, dtype=object)[dataset_idx],
+            "config": None,
+            "split": None,
+            "metric": [TASK_TO_METRIC[task][0] for task in tasks],
+            "score": scores[model_idx, dataset_idx],
+            "result_id": -1,
+            "valid": True,
+        }
+    )
+    models = [
+        {
+            "model_id": model_ids[i],
+            "source": "external",
+            **{column: values[i] for column, values in model_columns.items()},
+        }
+        for i in range(num_models)
+    ]
+    return {"models": models, "scores": scores_df}
+
+
+def make_boards_data(num_models: int, num_datasets: int, density: float, seed: int) -> dict:
+    table = make_table(num_models, num_datasets, density, seed)
+    data_tasks = {}
+    for task_category, task_list in get_task_dict(num_datasets).items():
+        data_tasks[task_category] = add_rank(table[BASE_COLUMNS + task_list].copy())
+    return {"synthetic": {"data_overall": None, "data_tasks": data_tasks}}
+
+
+def measure(func, setup, repeat: int) -> dict:
+    """
+    Time `func(*setup())` (best of `repeat` runs, setup excluded) and measure its peak memory in a separate run
+    """
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    args = setup()
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"time_s": min(times), "peak_memory_mb": peak / 1024**2}
+
+
+def run_benchmarks(sizes: list, density: float, repeat: int, max_store_cells: int, only: list | None) -> dict:
+    results = {}
+
+    def run(name: str, size: str, func, setup) -> None:
+        if only and name not in only:
+            return
+        key = f"{name}[{size}]"
+        print(f"Running {key}...", file=sys.stderr)
+        # Keep the progress prints of the benchmarked functions out of the JSON output
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            results[key] = measure(func, setup, repeat)
+        print(f"  {results[key]['time_s']:.4f}s, {results[key]['peak_memory_mb']:.1f}MB", file=sys.stderr)
+
+    for size in sizes:
+        num_models, num_datasets = parse_size(size)
+        table = make_table(num_models, num_datasets, density, seed=0)
+        run("add_rank", size, add_rank, lambda: (table.copy(),))
+
+        if num_models * num_datasets <= max_store_cells:
+            results_store = make_results_store(num_models, num_datasets, density, seed=0)
+            task_dict = get_task_dict(num_datasets)
+            # A copy of the store for every run, so that its score matrices are built again
+            run(
+                "get_mteb_average",
+                size,
+                lambda task_dict, results_store: get_mteb_average(task_dict, results_store=results_store),
+                lambda: ({k: list(v) for k, v in task_dict.items()}, dict(results_store)),
+            )
+            del results_store
+        else:
+            print(f"Skipping get_mteb_average[{size}], larger than --max-store-cells", file=sys.stderr)
+
+        boards_data = make_boards_data(num_models, num_datasets, density, seed=0)
+        tmp_dir = tempfile.mkdtemp(prefix="leaderboard_benchmark_")
+        try:
+            def setup_write():
+                shutil.rmtree(os.path.join(tmp_dir, "boards_data"), ignore_errors=True)
+                # write_out_results modifies the tables in place
+                boards_data_copy = {
+                    board: {
+                        "data_overall": None,
+                        "data_tasks": {task: df.copy() for task, df in board_data["data_tasks"].items()},
+                    }
+                    for board, board_data in boards_data.items()
+                }
+                return boards_data_copy, os.path.join(tmp_dir, "boards_data")
+
+            run("write_out_results", size, write_out_results, setup_write)
+            if not os.path.exists(os.path.join(tmp_dir, "boards_data")):
+                write_out_results(*setup_write())
+            run("load_results", size, load_results, lambda: (os.path.join(tmp_dir, "boards_data"),))
+
+            snapshot_path = os.path.join(tmp_dir, "snapshot")
+            run("write_snapshot", size, write_snapshot, lambda: (boards_data, snapshot_path))
+            if not os.path.exists(snapshot_path):
+                write_snapshot(boards_data, snapshot_path)
+            run("load_snapshot", size, load_snapshot, lambda: (snapshot_path,))
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        if not only or {"filter_data", "filter_data_cached", "get_table_page"} & set(only):
+            # Importing the app builds the Gradio Blocks, but does not launch it
+            import app
+            from app import MODEL_TYPES, NUMERIC_INTERVALS, filter_data, get_table_page, normalize_filters
+
+            # As done by the app when loading new results, with the synthetic tables instead of the ones of the app
+            app.TABLE_KEYS.clear()
+            app.TABLE_SOURCES.clear()
+            for task_category in boards_data["synthetic"]["data_tasks"]:
+                app.TABLE_KEYS.append(("synthetic", task_category))
+                app.TABLE_SOURCES[("synthetic", task_category)] = ("synthetic", task_category)
+            model_flags = get_model_flags(list(boards_data["synthetic"]["data_tasks"].values()))
+            app.swap_state(app.build_state("synthetic", boards_data, model_flags, build_api=False))
+            tables = app.STATE["tables"]
+            filter_args = (
+                "synthetic-model-1;model-42",
+                [model_type for model_type in MODEL_TYPES if model_type != "Proprietary"],
+                list(NUMERIC_INTERVALS.keys())[:3],
+                *tables,
+            )
+
+            def setup_filter():
+                app.clear_filter_cache()
+                return filter_args
+
+            run("filter_data", size, filter_data, setup_filter)
+            app.clear_filter_cache()
+            filter_data(*filter_args)
+            run("filter_data_cached", size, filter_data, lambda: filter_args)
+
+            # Second page of the largest table, sorted by its last dataset (the paginated mode of the app)
+            table_key = max(tables, key=lambda key: tables[key].shape[1])
+
+            def setup_page():
+                app.clear_filter_cache()
+                sort_by = tables[table_key].columns[-1]
+                return "synthetic", table_key, normalize_filters(*filter_args[:3]), sort_by, False, 2
+
+            run("get_table_page", size, get_table_page, setup_page)
+    return results
+
+
+def compare(results: dict, baseline: dict, max_slowdown: float, max_memory_increase: float) -> bool:
+    """Print the comparison with a baseline and return whether any benchmark regressed"""
+    regressed = False
+    for key, result in results.items():
+        if key not in baseline:
+            print(f"{key}: no baseline", file=sys.stderr)
+            continue
+        slowdown = result["time_s"] / max(baseline[key]["time_s"], 1e-9)
+        memory_increase = result["peak_memory_mb"] / max(baseline[key]["peak_memory_mb"], 1e-9)
+        status = "OK"
+        if (slowdown > max_slowdown) or (memory_increase > max_memory_increase):
+            status = "REGRESSION"
+            regressed = True
+        print(f"{key}: time x{slowdown:.2f}, memory x{memory_increase:.2f} {status}", file=sys.stderr)
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["1000x50", "10000x200", "50000x1000"], help="<models>x<datasets>")
+    parser.add_argument("--density", type=float, default=0.8, help="Fraction of the model x dataset scores present")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-store-cells", type=int, default=2_000_000, help="Skip get_mteb_average above this number of models x datasets")
+    parser.add_argument("--only", nargs="+", default=None, help="Only run these benchmarks")
+    parser.add_argument("--output", default=None, help="Where to write the results as JSON (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Results of a previous run to compare with")
+    parser.add_argument("--max-slowdown", type=float, default=1.2)
+    parser.add_argument("--max-memory-increase", type=float, default=1.2)
+    args = parser.parse_args()
+
+    # The pandas warnings of the leaderboard code are known, don't flood the output with them
+    warnings.simplefilter("ignore", FutureWarning)
+    pd.options.mode.chained_assignment = None
+
+    results = run_benchmarks(args.sizes, args.density, args.repeat, args.max_store_cells, args.only)
+    output = {
+        "meta": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "density": args.density,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=4)
+    else:
+        print(json.dumps(output, indent=4))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.max_slowdown, args.max_memory_increase):
+            sys.exit(1)
@@ -35,6 +35,34 @@ LEADERBOARD_NAME = get_config("LEADERBOARD_NAME", "MTEB Leaderboard")
 
 REPO_ID = get_config("REPO_ID", "mteb/leaderboard")
 RESULTS_REPO = get_config("RESULTS_REPO", "mteb/results")
+# Optional path to a local checkout of the results repository, used instead of downloading the results dataset
+RESULTS_CHECKOUT = get_config("RESULTS_CHECKOUT", None)
+
+# Number of concurrent requests used to prefetch model cards and size information from the Hub
+FETCH_CONCURRENCY = int(get_config("FETCH_CONCURRENCY", 16))
+
+# Number of filtered tables cached by the app
+FILTER_CACHE_SIZE = int(get_config("FILTER_CACHE_SIZE", 512))
+# Show the tables page by page, sorted and paginated on the server
+PAGINATE = str2bool(get_config("PAGINATE", False))
+PAGE_SIZE = int(get_config("PAGE_SIZE", 50))
+# Maximum number of events waiting in the queue of the app, further ones are rejected
+QUEUE_MAX_SIZE = int(get_config("QUEUE_MAX_SIZE", 100))
+# Number of events of each type run at once: the cheap ones (URL updates, tabs on load), and the ones filtering or
+# sorting the tables, which also get as many worker threads
+UI_CONCURRENCY_LIMIT = int(get_config("UI_CONCURRENCY_LIMIT", 16))
+FILTER_CONCURRENCY_LIMIT = int(get_config("FILTER_CONCURRENCY_LIMIT", 2))
+# Serve the read-only JSON/CSV API of the tables (see utils/table_api.py) next to the app
+SERVE_API = str2bool(get_config("SERVE_API", True))
+
+# Folder of the snapshot of the computed leaderboard (see utils/snapshot.py)
+SNAPSHOT_PATH = get_config("SNAPSHOT_PATH", "snapshot")
+# Also write the results as the legacy `boards_data` folder of JSONL files
+WRITE_LEGACY_RESULTS = str2bool(get_config("WRITE_LEGACY_RESULTS", True))
+# Optional folder where refresh.py pre-renders every table as static HTML + JSON files (see utils/static_export.py)
+STATIC_EXPORT_PATH = get_config("STATIC_EXPORT_PATH", None)
+# Interval (in seconds) at which the app checks for a new snapshot to load without restarting, 0 to never check
+RELOAD_INTERVAL = float(get_config("RELOAD_INTERVAL", 60))
 
 CACHE_PATH = get_config("HF_HOME", ".")
 os.environ["HF_HOME"] = CACHE_PATH
@@ -48,3 +76,9 @@ else:
     print(f"Write access confirmed for HF_HOME")
 
 API = HfApi(token=HF_TOKEN)
+
+# Record the Hub responses of a run with "record" and replay them offline with "replay" (see utils/hub_replay.py)
+HUB_REPLAY_MODE = get_config("HUB_REPLAY_MODE", None)
+HUB_REPLAY_PATH = get_config("HUB_REPLAY_PATH", "hub_replay")
+# Latency in seconds added to every replayed call, to simulate network conditions
+HUB_REPLAY_LATENCY = float(get_config("HUB_REPLAY_LATENCY", 0))
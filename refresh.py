@@ -4,17 +4,25 @@ import json
 
 import os
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 from typing import Any
 
+import numpy as np
 import pandas as pd
-from datasets import load_dataset
-from huggingface_hub import hf_hub_download
+from datasets import Dataset, DatasetDict
 from huggingface_hub.repocard import metadata_load
 from tqdm.autonotebook import tqdm
 
-from envs import API, LEADERBOARD_CONFIG, MODEL_META, REPO_ID, RESULTS_REPO
+from envs import CACHE_PATH, FETCH_CONCURRENCY, LEADERBOARD_CONFIG, MODEL_META, REPO_ID, RESULTS_CHECKOUT, RESULTS_REPO, SNAPSHOT_PATH, STATIC_EXPORT_PATH, WRITE_LEGACY_RESULTS
+from utils.hub_replay import hf_hub_download, list_models, load_dataset
 from utils.model_size import get_model_parameters_memory
+from utils.results_checkout import find_model_results_dir, hash_results_dir, load_results_dir, select_revision_dir
+from utils.score_matrix import get_group_masks, get_masked_means, get_scores, to_score_matrix
+from utils.snapshot import load_snapshot, snapshot_exists, write_snapshot
+from utils.static_export import write_static_export
+from utils.table_format import format_table, get_typed_table
 
 MODEL_CACHE = {}
 TASKS_CONFIG = LEADERBOARD_CONFIG["tasks"]
@@ -37,6 +45,12 @@ TASK_TO_METRIC["PairClassification"].append("ap")
 TASK_TO_METRIC["PairClassification"].append("cos_sim_ap")
 TASK_TO_METRIC["PairClassification"].append("cosine_ap")
 
+# Metric names that can be selected by `filter_metric_fetched` for any board; everything else reported in the model
+# cards is dropped when caching and ingesting them
+CANDIDATE_METRICS = {
+    metric for metrics in TASK_TO_METRIC.values() for metric in metrics
+} | {"ndcg_at_1", "recall_at_1", "NDCG@10(MIRACL)"}
+
 
 EXTERNAL_MODELS = {
     k for k, v in MODEL_META["model_meta"].items() if v.get("is_external", False)
@@ -76,6 +90,15 @@ INSTRUCT_MODELS = {
 NOINSTRUCT_MODELS = {
     k for k, v in MODEL_META["model_meta"].items() if not v.get("uses_instruct", False)
 }
+# Bits of the model type flags saved with the results (see `get_model_flags`), "Open" models are the non-proprietary ones
+MODEL_TYPE_FLAGS = {
+    "Proprietary": 1,
+    "Sentence Transformers": 2,
+    "Cross-Encoders": 4,
+    "Bi-Encoders": 8,
+    "Uses Instructions": 16,
+    "No Instructions": 32,
+}
 
 
 TASK_TO_TASK_TYPE = {task_category: [] for task_category in TASKS}
@@ -85,17 +108,37 @@ for k, board_config in BOARDS_CONFIG.items():
         TASK_TO_TASK_TYPE[task_category].extend(task_list)
         if "split" in board_config:
             TASK_TO_SPLIT[k] = board_config["split"]
+# Legacy names of renamed datasets, whose results are also fetched and merged into the new columns (see
+# `get_mteb_data`)
+LEGACY_DATASET_NAMES = {
+    "MLSUMClusteringP2P (fr)": "MLSUMClusteringP2P",
+    "MLSUMClusteringS2S (fr)": "MLSUMClusteringS2S",
+    "PawsXPairClassification (fr)": "PawsX (fr)",
+}
 
 
-## Don't cache this because we want to re-compute every time
-# model_infos_path = "model_infos.json"
+# Extracted model card results and size information of the Hub models, cached across runs. An entry is only
+# re-fetched when the revision of the model changed since the last run (see `fetch_model_infos`)
+MODEL_INFOS_PATH = os.path.join(CACHE_PATH, "leaderboard_cache", "model_infos.json")
 MODEL_INFOS = {}
-# if os.path.exists(model_infos_path):
-#     with open(model_infos_path) as f:
-#         MODEL_INFOS = json.load(f)
+if os.path.exists(MODEL_INFOS_PATH):
+    with open(MODEL_INFOS_PATH) as f:
+        model_infos_cache = json.load(f)
+    # The cached model cards only contain the candidate metrics, so they are stale if those changed
+    if set(model_infos_cache.get("candidate_metrics", [])) == CANDIDATE_METRICS:
+        MODEL_INFOS = model_infos_cache["models"]
 
 
 def add_rank(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sort a table by its score, or by the average of its scores if there are several, then rank and round it
+
+    Args:
+        df: The table of the scores of the models
+
+    Returns:
+        The ranked table, with typed columns (see utils/table_format.py)
+    """
     cols_to_rank = [
         col
         for col in df.columns
@@ -109,19 +152,17 @@ def add_rank(df: pd.DataFrame) -> pd.DataFrame:
         ]
     ]
     if len(cols_to_rank) == 1:
-        df.sort_values(cols_to_rank[0], ascending=False, inplace=True)
+        df = df.sort_values(cols_to_rank[0], ascending=False)
     else:
+        scores = df[cols_to_rank].to_numpy(dtype=np.float64)
         df.insert(
             len(df.columns) - len(cols_to_rank),
             "Average",
-            df[cols_to_rank].mean(axis=1, skipna=False),
+            get_masked_means(scores, get_group_masks(cols_to_rank, {"Average": cols_to_rank}))[:, 0],
         )
-        df.sort_values("Average", ascending=False, inplace=True)
+        df = df.sort_values("Average", ascending=False)
     df.insert(0, "Rank", list(range(1, len(df) + 1)))
-    df = df.round(2)
-    # Fill NaN after averaging
-    df.fillna("", inplace=True)
-    return df
+    return get_typed_table(df.round(2))
 
 
 def make_clickable_model(model_name: str, link: None | str = None) -> str:
@@ -133,46 +174,95 @@ def make_clickable_model(model_name: str, link: None | str = None) -> str:
     return f'<a target="_blank" style="text-decoration: underline" href="{link}">{model_name}</a>'
 
 
-def add_subset(examples):
-    if not (examples["hf_subset"]) or (examples["hf_subset"] == "default"):
-        examples["mteb_dataset_name_with_lang"] = examples["mteb_dataset_name"]
-    else:
-        examples["mteb_dataset_name_with_lang"] = (
-            examples["mteb_dataset_name"] + f' ({examples["hf_subset"]})'
-        )
-    return examples
+def add_subset(df: pd.DataFrame) -> pd.DataFrame:
+    subsets = df["hf_subset"]
+    no_subset = subsets.isna() | subsets.eq("") | subsets.eq("default")
+    df["mteb_dataset_name_with_lang"] = df["mteb_dataset_name"].where(
+        no_subset, df["mteb_dataset_name"] + " (" + subsets.fillna("").astype(str) + ")"
+    )
+    return df
 
 
 def norm(names: list[str]) -> set[str]:
     return set([name.split()[0] for name in names])
 
 
-def add_task(examples):
+# Task category of every dataset of the boards, without its language (e.g. "AmazonReviewsClassification"), the first
+# category listing it wins
+DATASET_TO_TASK_TYPE = {}
+for task_category, task_list in TASK_TO_TASK_TYPE.items():
+    for dataset_name in norm(task_list):
+        DATASET_TO_TASK_TYPE.setdefault(dataset_name, task_category)
+
+
+def get_task_type(dataset_name: str) -> str:
+    if dataset_name in DATASET_TO_TASK_TYPE:
+        return DATASET_TO_TASK_TYPE[dataset_name]
+    print("WARNING: Task not found for dataset", dataset_name)
+    return "Unknown"
+
+
+def add_task(df: pd.DataFrame) -> pd.DataFrame:
     # Could be added to the dataset loading script instead
-    task_name = examples["mteb_dataset_name"]
-    task_type = None
-    for task_category, task_list in TASK_TO_TASK_TYPE.items():
-        if task_name in norm(task_list):
-            task_type = task_category
-            break
-    if task_type is not None:
-        examples["mteb_task"] = task_type
-    else:
-        print("WARNING: Task not found for dataset", examples["mteb_dataset_name"])
-        examples["mteb_task"] = "Unknown"
-    return examples
+    dataset_names = df["mteb_dataset_name"]
+    df["mteb_task"] = dataset_names.map({name: get_task_type(name) for name in dataset_names.unique()})
+    return df
 
 
-def filter_metric_external(x, task, metrics) -> bool:
+def filter_metric_external(df: pd.DataFrame) -> pd.Series:
+    """
+    Get the mask of the rows of the results of an external model with the metric expected for their task
+
+    Args:
+        df: The results with the "mteb_task" column
+
+    Returns:
+        A boolean Series aligned with `df`
+    """
+    metric_names = df["metric"]
+    mask = pd.Series(
+        pd.MultiIndex.from_arrays([df["mteb_task"], metric_names]).isin(
+            [(task, metric) for task, metrics in TASK_TO_METRIC.items() for metric in metrics]
+        ),
+        index=df.index,
+    )
+    dataset_names = df["mteb_dataset_name"]
+    split = df["split"] if "split" in df.columns else pd.Series("", index=df.index)
     # This is a hack for the passkey and needle retrieval test, which reports ndcg_at_1 (i.e. accuracy), rather than the ndcg_at_10 that is commonly used for retrieval tasks.
-    if x["mteb_dataset_name"] in ["LEMBNeedleRetrieval", "LEMBPasskeyRetrieval"]:
-        return bool(x["mteb_task"] == task and x["metric"] == "ndcg_at_1")
-    elif (x["mteb_dataset_name"].startswith("BrightRetrieval") and (x["split"] == "long")):
-        return bool(x["mteb_task"] == task and x["metric"] in ["recall_at_1"])
-    elif x["mteb_dataset_name"] == "MIRACLReranking":
-        return bool(x["mteb_task"] == task and x["metric"] in ["NDCG@10(MIRACL)"])
-    else:
-        return bool(x["mteb_task"] == task and x["metric"] in metrics)
+    is_lemb = dataset_names.isin(["LEMBNeedleRetrieval", "LEMBPasskeyRetrieval"])
+    is_bright_long = ~is_lemb & dataset_names.str.startswith("BrightRetrieval") & (split == "long")
+    is_miracl = ~is_lemb & ~is_bright_long & (dataset_names == "MIRACLReranking")
+    mask = mask.where(~is_lemb, metric_names == "ndcg_at_1")
+    mask = mask.where(~is_bright_long, metric_names == "recall_at_1")
+    mask = mask.where(~is_miracl, metric_names == "NDCG@10(MIRACL)")
+    return mask & df["mteb_task"].isin(TASK_TO_METRIC.keys())
+
+
+def group_external_model_results(df: pd.DataFrame) -> list[tuple[str, str, dict]]:
+    """
+    Split the results of an external model into one dict of scores per task and metric, in a single group-by
+
+    Args:
+        df: The results of the model, as rows of the results dataset
+
+    Returns:
+        (task, metric, {dataset name with language: score}) tuples, ordered like `TASK_TO_METRIC`
+    """
+    df = add_task(add_subset(df))
+    df = df[filter_metric_external(df)]
+    task_order = {task: i for i, task in enumerate(TASK_TO_METRIC)}
+    groups = sorted(
+        df.groupby(["mteb_task", "metric"], sort=False),
+        key=lambda group: task_order[group[0][0]],
+    )
+    out = []
+    for (task, metric), df_group in groups:
+        scores = {
+            k: round(v, 2)
+            for k, v in zip(df_group["mteb_dataset_name_with_lang"], df_group["score"])
+        }
+        out.append((task, metric, scores))
+    return out
 
 
 def filter_metric_fetched(name: str, metric: str, expected_metrics, split: str) -> bool:
@@ -223,6 +313,110 @@ def get_dim_seq_size(model):
     return dim, seq, parameters, memory
 
 
+def get_model_dim_seq_size(model) -> list | None:
+    try:
+        return list(get_dim_seq_size(model))
+    except Exception:
+        # Gated repos, these are looked up in the external metadata instead
+        return None
+
+
+def get_external_dim_seq_size(model_id: str) -> list:
+    name_without_org = model_id.split("/")[-1]
+    # EXTERNAL_MODEL_TO_SIZE[name_without_org] refers to millions of parameters, so for memory usage
+    # we multiply by 1e6 to get just the number of parameters, then by 4 to get the number of bytes
+    # given fp32 precision (4 bytes per float), then divide by 1024**3 to get the number of GB
+    return [
+        EXTERNAL_MODEL_TO_DIM.get(name_without_org, ""),
+        EXTERNAL_MODEL_TO_SEQLEN.get(name_without_org, ""),
+        EXTERNAL_MODEL_TO_SIZE.get(name_without_org, ""),
+        round(
+            EXTERNAL_MODEL_TO_SIZE[name_without_org]
+            * 1e6
+            * 4
+            / 1024**3,
+            2,
+        )
+        if name_without_org in EXTERNAL_MODEL_TO_SIZE
+        else "",
+    ]
+
+
+def get_changed_external_models(results_hashes: dict) -> dict:
+    """
+    Find the external models whose result files in the local results checkout changed since they were last ingested
+
+    Args:
+        results_hashes: The content hashes of the result folders of the last ingestion, by model
+
+    Returns:
+        The changed models with the content hash of their result folder
+    """
+    changed_models = {}
+    for model in sorted(EXTERNAL_MODELS):
+        results_dir = get_external_model_results_dir(model)
+        if results_dir is None:
+            continue
+        results_hash = hash_results_dir(results_dir)
+        if results_hashes.get(model, None) != results_hash:
+            changed_models[model] = results_hash
+    return changed_models
+
+
+def get_external_model_org(model: str) -> str | None:
+    link = MODEL_META["model_meta"].get(model, {}).get("link", None)
+    return link.split("/")[-2] if link else None
+
+
+def get_external_model_results_dir(model: str) -> str | None:
+    """
+    Get the folder with the results of an external model in the local results checkout, only the ones of its
+        "results_revision" in the model metadata if set, else of its latest revision
+
+    Args:
+        model: The name of the external model
+
+    Returns:
+        The folder of the results of the revision, or None if the checkout has none
+    """
+    results_dir = find_model_results_dir(RESULTS_CHECKOUT, model, get_external_model_org(model))
+    if results_dir is None:
+        return None
+    return select_revision_dir(results_dir, MODEL_META["model_meta"].get(model, {}).get("results_revision", None))
+
+
+def load_external_model_results(model: str) -> DatasetDict:
+    if RESULTS_CHECKOUT is not None:
+        results_dir = get_external_model_results_dir(model)
+        if results_dir is None:
+            raise ValueError(f"No results folder for {model} in {RESULTS_CHECKOUT}")
+        rows = load_results_dir(results_dir)
+        if not rows:
+            raise ValueError(f"No results in {results_dir}")
+        return DatasetDict({"test": Dataset.from_list(rows)})
+    try:
+        return load_dataset(
+            RESULTS_REPO,
+            model,
+            trust_remote_code=True,
+            download_mode="force_redownload",
+            verification_mode="no_checks",
+        )
+    except (KeyError, ValueError) as e:
+        org = get_external_model_org(model)
+        if org is None:
+            # Skipped by the caller, as the other models without results
+            raise ValueError(f"No results config {model!r} and no organization to look for: {e}") from e
+        model_tmp = "__".join([org, model])
+        return load_dataset(
+            RESULTS_REPO,
+            model_tmp,
+            trust_remote_code=True,
+            download_mode="force_redownload",
+            verification_mode="no_checks",
+        )
+
+
 def get_external_model_results():
     if os.path.exists("EXTERNAL_MODEL_RESULTS.json"):
         with open("EXTERNAL_MODEL_RESULTS.json") as f:
@@ -245,32 +439,31 @@ def get_external_model_results():
         }
         models_to_run = EXTERNAL_MODELS
 
+    # With a local checkout of the results repository, re-ingest the models whose result files changed
+    results_hashes = {}
+    changed_models = {}
+    if RESULTS_CHECKOUT is not None:
+        if os.path.exists("EXTERNAL_MODEL_RESULTS_HASHES.json"):
+            with open("EXTERNAL_MODEL_RESULTS_HASHES.json") as f:
+                results_hashes = json.load(f)
+        changed_models = get_changed_external_models(results_hashes)
+        models_to_run = sorted(set(models_to_run) | set(changed_models))
+
     pbar = tqdm(models_to_run, desc="Fetching external model results")
     for model in pbar:
         pbar.set_description(f"Fetching external model results for {model!r}")
         try:
-            ds = load_dataset(
-                RESULTS_REPO,
-                model,
-                trust_remote_code=True,
-                download_mode="force_redownload",
-                verification_mode="no_checks",
-            )
-        except (KeyError, ValueError) as e:
-            model_tmp = "__".join([MODEL_META["model_meta"][model]["link"].split("/")[-2], model])
-            ds = load_dataset(
-                RESULTS_REPO,
-                model_tmp,
-                trust_remote_code=True,
-                download_mode="force_redownload",
-                verification_mode="no_checks",
-            )
+            ds = load_external_model_results(model)
         except ValueError as e:
-            print(f"Can't fined model {model} in results repository. Exception: {e}")
+            print(f"Can't find model {model} in results repository. Exception: {e}")
             continue
+        if model in changed_models:
+            # Replace the cached results of the model
+            EXTERNAL_MODEL_RESULTS[model] = {
+                k: {v[0]: []} for k, v in TASK_TO_METRIC.items()
+            }
+            results_hashes[model] = changed_models[model]
 
-        ds = ds.map(add_subset)
-        ds = ds.map(add_task)
         base_dict = {
             "Model": make_clickable_model(
                 model,
@@ -280,44 +473,22 @@ def get_external_model_results():
             )
         }
 
-        for task, metrics in TASK_TO_METRIC.items():
-            ds_sub = ds.filter(lambda x: filter_metric_external(x, task, metrics))[
-                "test"
-            ]
-            curent_task_metrics = ds_sub.unique("metric")
-            for metric in curent_task_metrics:
-                ds_dict = ds_sub.filter(lambda x: x["metric"] == metric).to_dict()
-                ds_dict = {
-                    k: round(v, 2)
-                    for k, v in zip(
-                        ds_dict["mteb_dataset_name_with_lang"], ds_dict["score"]
-                    )
-                }
-                # metrics[0] is the main name for this metric; other names in the list are legacy for backward-compat
-                # except for recall_at_1, which is the main name for BrightRetrieval (Long)
-                metric = metrics[0] if metric != "recall_at_1" else metric
-                if metric not in EXTERNAL_MODEL_RESULTS[model][task]:
-                    EXTERNAL_MODEL_RESULTS[model][task][metric] = []
-                EXTERNAL_MODEL_RESULTS[model][task][metric].append(
-                    {**base_dict, **ds_dict}
-                )
-            #ds_dict = ds.filter(lambda x: filter_metric_external(x, task, metrics))[
-            #    "test"
-            #].to_dict()
-            #ds_dict = {
-            #    k: round(v, 2)
-            #    for k, v in zip(
-            #        ds_dict["mteb_dataset_name_with_lang"], ds_dict["score"]
-            #    )
-            #}
-            ## metrics[0] is the main name for this metric; other names in the list are legacy for backward-compat
-            #EXTERNAL_MODEL_RESULTS[model][task][metrics[0]].append(
-            #    {**base_dict, **ds_dict}
-            #)
+        for task, metric, ds_dict in group_external_model_results(ds["test"].to_pandas()):
+            # metrics[0] is the main name for this metric; other names in the list are legacy for backward-compat
+            # except for recall_at_1, which is the main name for BrightRetrieval (Long)
+            metric = TASK_TO_METRIC[task][0] if metric != "recall_at_1" else metric
+            if metric not in EXTERNAL_MODEL_RESULTS[model][task]:
+                EXTERNAL_MODEL_RESULTS[model][task][metric] = []
+            EXTERNAL_MODEL_RESULTS[model][task][metric].append(
+                {**base_dict, **ds_dict}
+            )
 
     # Save & cache EXTERNAL_MODEL_RESULTS
     with open("EXTERNAL_MODEL_RESULTS.json", "w") as f:
         json.dump(dict(sorted(EXTERNAL_MODEL_RESULTS.items())), f, indent=4)
+    if RESULTS_CHECKOUT is not None:
+        with open("EXTERNAL_MODEL_RESULTS_HASHES.json", "w") as f:
+            json.dump(dict(sorted(results_hashes.items())), f, indent=4)
 
     return EXTERNAL_MODEL_RESULTS
 
@@ -331,88 +502,244 @@ def download_or_use_cache(modelId: str):
     except Exception:
         print(f"ERROR: Could not fetch metadata for {modelId}, trying again")
         readme_path = hf_hub_download(modelId, filename="README.md", etag_timeout=30)
-    meta = metadata_load(readme_path)
+    meta = extract_model_index(metadata_load(readme_path))
     MODEL_CACHE[modelId] = meta
     return meta
 
 
+def extract_model_index(meta: dict) -> dict:
+    """
+    Only keep the `model-index` of the model card metadata, with the metrics that can be used by a board
+
+    Args:
+        meta: The metadata of the model card
+
+    Returns:
+        The metadata with only the (reduced) `model-index`, or an empty dict if the model card does not have one
+    """
+    if not meta or "model-index" not in meta:
+        return {}
+    results = []
+    for sub_res in meta["model-index"][0]["results"]:
+        if isinstance(sub_res.get("metrics", None), list):
+            sub_res = {
+                **sub_res,
+                "metrics": [
+                    score
+                    for score in sub_res["metrics"]
+                    if ("type" not in score) or (score["type"] in CANDIDATE_METRICS)
+                ],
+            }
+        results.append(sub_res)
+    return {"model-index": [{"results": results}]}
+
+
+def get_model_revision(model) -> str | None:
+    if getattr(model, "sha", None):
+        return model.sha
+    last_modified = getattr(model, "last_modified", None)
+    return str(last_modified) if last_modified is not None else None
+
+
+def fetch_model_infos(models: list) -> None:
+    """
+    Fill `MODEL_CACHE` and `MODEL_INFOS` with the README metadata and the size/dim information of all models, so that
+        the (sequential and deterministic) ingestion loop in `build_results_store` only reads from memory. Models
+        whose revision did not change since the last run are taken from the on-disk cache, the others are fetched
+        in parallel with a bounded thread pool.
+
+    Args:
+        models: The `ModelInfo` objects returned by `list_models`
+    """
+    def fetch(model) -> None:
+        try:
+            meta = download_or_use_cache(model.modelId)
+            MODEL_INFOS[model.modelId]["metadata"] = meta
+            if "model-index" in meta:
+                MODEL_INFOS[model.modelId]["dim_seq_size"] = get_model_dim_seq_size(model)
+        except Exception as e:
+            # Leave it uncached, the ingestion loop will try again and report the error
+            print(f"ERROR: Could not prefetch metadata for {model.modelId}: {e}")
+
+    models_to_fetch = []
+    for model in models:
+        if model.modelId in MODELS_TO_SKIP or model.modelId in MODEL_CACHE:
+            continue
+        revision = get_model_revision(model)
+        model_infos = MODEL_INFOS.get(model.modelId, {})
+        if (revision is not None) and (model_infos.get("revision", None) == revision) and ("metadata" in model_infos):
+            MODEL_CACHE[model.modelId] = model_infos["metadata"]
+            continue
+        MODEL_INFOS[model.modelId] = {"revision": revision}
+        models_to_fetch.append(model)
+
+    print(f"Fetching metadata of {len(models_to_fetch)} new or updated models, {len(models) - len(models_to_fetch)} cached")
+    with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as executor:
+        for _ in tqdm(
+            executor.map(fetch, models_to_fetch),
+            total=len(models_to_fetch),
+            desc="Prefetching model metadata",
+        ):
+            pass
+
+
+def save_model_infos(model_ids: list) -> None:
+    """
+    Save the `MODEL_INFOS` of `model_ids` to `MODEL_INFOS_PATH`, so that the next run only fetches updated models
+
+    Args:
+        model_ids: The models to keep in the cache, i.e. the ones still listed on the Hub
+    """
+    os.makedirs(os.path.dirname(MODEL_INFOS_PATH), exist_ok=True)
+    model_infos = {
+        model_id: MODEL_INFOS[model_id]
+        for model_id in sorted(model_ids)
+        if "metadata" in MODEL_INFOS.get(model_id, {})
+    }
+    with open(MODEL_INFOS_PATH, "w") as f:
+        json.dump(
+            {"candidate_metrics": sorted(CANDIDATE_METRICS), "models": model_infos},
+            f,
+            default=str,
+        )
+
+
 def simplify_dataset_name(name):
     return name.replace("MTEB ", "").replace(" (default)", "")
 
 
-def get_mteb_data(
-    tasks: list = ["Clustering"],
-    langs: list = [],
-    datasets: list = [],
-    fillna: bool = True,
-    add_emb_dim: bool = True,
-    task_to_metric: dict = TASK_TO_METRIC,
-    rank: bool = True,
-) -> pd.DataFrame:
+RESULTS_STORE_COLUMNS = [
+    "model_id",
+    "source",
+    "task",
+    "dataset",
+    "dataset_name",
+    "config",
+    "split",
+    "metric",
+    "score",
+    "result_id",
+    "valid",
+]
+
+RESULTS_STORE = None
+
+
+def get_model_index_rows(model_id: str, results: list, result_id: int) -> tuple[list, int]:
+    """
+    Flatten the `model-index` results of a model card into rows of the results store
+
+    Args:
+        model_id: The id of the model on the Hub
+        results: The `meta['model-index'][0]["results"]` list of the model card
+        result_id: The first id to use for the results of this model
+
+    Returns:
+        The rows and the next free result id
+    """
+    rows = []
+    for sub_res in results:
+        task = sub_res.get("task", {}).get("type", "")
+        dataset = sub_res.get("dataset", {})
+        name = dataset.get("name", "")
+        base_row = {
+            "model_id": model_id,
+            "source": "hub",
+            "task": task,
+            "dataset": simplify_dataset_name(name),
+            "dataset_name": name,
+            "config": dataset.get("config", "default"),
+            "split": dataset.get("split", None),
+        }
+        # Incompatible entries are kept (but marked as invalid) so that selecting them skips the model, like before
+        valid = ("name" in dataset) and ("split" in dataset) and ("metrics" in sub_res)
+        metric_rows = []
+        for score in sub_res.get("metrics", []):
+            if "type" not in score:
+                valid = False
+            elif score["type"] in CANDIDATE_METRICS:
+                value = score.get("value", None)
+                if not isinstance(value, (int, float)):
+                    valid = False
+                    continue
+                metric_rows.append({**base_row, "metric": score["type"], "score": round(value, 2)})
+        if not metric_rows:
+            # Keep track of results without any usable metric
+            metric_rows.append({**base_row, "metric": None, "score": None})
+        for row in metric_rows:
+            row["result_id"] = result_id
+            row["valid"] = valid
+        rows.extend(metric_rows)
+        result_id += 1
+    return rows, result_id
+
+
+def build_results_store() -> dict:
+    """
+    Ingest the external model results and the results in the model cards of all models on the Hub into a single
+        long-format table (model x task x dataset x split x metric x score). Every leaderboard view is then a selection
+        on this table, so the network sweep only happens once per refresh.
+
+    Returns:
+        A dict with "models", the list of models with their metadata columns in ingestion order, and "scores", the
+            long-format DataFrame with `RESULTS_STORE_COLUMNS`
+    """
     global MODEL_INFOS
 
     with open("EXTERNAL_MODEL_RESULTS.json", "r") as f:
         external_model_results = json.load(f)
 
-    api = API
-    models = list(api.list_models(filter="mteb", full=True))
-    # Legacy names changes; Also fetch the old results & merge later
-    if "MLSUMClusteringP2P (fr)" in datasets:
-        datasets.append("MLSUMClusteringP2P")
-    if "MLSUMClusteringS2S (fr)" in datasets:
-        datasets.append("MLSUMClusteringS2S")
-    if "PawsXPairClassification (fr)" in datasets:
-        datasets.append("PawsX (fr)")
-    # Initialize list to models that we cannot fetch metadata from
-    df_list = []
-    for model in external_model_results:
-        results_list = []
-        for task in tasks:
-            # Not all models have InstructionRetrieval, other new tasks
-            if task not in external_model_results[model]: continue
-            if task_to_metric[task][0] not in external_model_results[model][task]: continue
-            results_list += external_model_results[model][task][task_to_metric[task][0]]
-
-        if len(datasets) > 0:
-            res = {
-                k: v
-                for d in results_list
-                for k, v in d.items()
-                if (k == "Model") or any([x in k for x in datasets])
-            }
-        elif langs:
-            # Would be cleaner to rely on an extra language column instead
-            langs_format = [f"({lang})" for lang in langs]
-            res = {
-                k: v
-                for d in results_list
-                for k, v in d.items()
-                if any([k.split(" ")[-1] in (k, x) for x in langs_format])
+    model_rows = []
+    score_rows = []
+    for model, model_results in external_model_results.items():
+        model_name = None
+        for task, task_results in model_results.items():
+            for metric, entries in task_results.items():
+                for entry in entries:
+                    for k, v in entry.items():
+                        if k == "Model":
+                            model_name = v
+                            continue
+                        score_rows.append(
+                            {
+                                "model_id": model,
+                                "source": "external",
+                                "task": task,
+                                "dataset": k,
+                                "dataset_name": k,
+                                "config": None,
+                                "split": None,
+                                "metric": metric,
+                                "score": v,
+                                "result_id": -1,
+                                "valid": True,
+                            }
+                        )
+        if model_name is None:
+            continue
+        size = EXTERNAL_MODEL_TO_SIZE.get(model, "")
+        model_rows.append(
+            {
+                "model_id": model,
+                "source": "external",
+                "Model": model_name,
+                "Model Size (Million Parameters)": size,
+                "Memory Usage (GB, fp32)": round(size * 1e6 * 4 / 1024**3, 2) if size != "" else "",
+                "Embedding Dimensions": EXTERNAL_MODEL_TO_DIM.get(model, ""),
+                "Max Tokens": EXTERNAL_MODEL_TO_SEQLEN.get(model, ""),
             }
-        else:
-            res = {k: v for d in results_list for k, v in d.items()}
-        # Model & at least one result
-        if len(res) > 1:
-            if add_emb_dim:
-                res["Model Size (Million Parameters)"] = EXTERNAL_MODEL_TO_SIZE.get(
-                    model, ""
-                )
-                res["Memory Usage (GB, fp32)"] = (
-                    round(res["Model Size (Million Parameters)"] * 1e6 * 4 / 1024**3, 2)
-                    if res["Model Size (Million Parameters)"] != ""
-                    else ""
-                )
-                res["Embedding Dimensions"] = EXTERNAL_MODEL_TO_DIM.get(model, "")
-                res["Max Tokens"] = EXTERNAL_MODEL_TO_SEQLEN.get(model, "")
-            df_list.append(res)
+        )
 
+    models = list(list_models(filter="mteb", full=True))
+    fetch_model_infos(models)
+    result_id = 0
     pbar = tqdm(models, desc="Fetching model metadata")
     for model in pbar:
         if model.modelId in MODELS_TO_SKIP:
             continue
         pbar.set_description(f"Fetching {model.modelId!r} metadata")
         meta = download_or_use_cache(model.modelId)
-        MODEL_INFOS[model.modelId] = {"metadata": meta}
+        MODEL_INFOS.setdefault(model.modelId, {})["metadata"] = meta
         if "model-index" not in meta:
             continue
         # meta['model-index'][0]["results"] is list of elements like:
@@ -429,98 +756,268 @@ def get_mteb_data(
         #        {"type": "f1", "value": 38.809586587791664},
         #    ],
         # },
-        # Use "get" instead of dict indexing to skip incompat metadata instead of erroring out
-        if len(datasets) > 0:
-            task_results = [
-                sub_res
-                for sub_res in meta["model-index"][0]["results"]
-                if (sub_res.get("task", {}).get("type", "") in tasks)
-                and any(
-                    [x in sub_res.get("dataset", {}).get("name", "") for x in datasets]
-                )
-            ]
-        elif langs:
-            task_results = [
-                sub_res
-                for sub_res in meta["model-index"][0]["results"]
-                if (sub_res.get("task", {}).get("type", "") in tasks)
-                and (
-                    sub_res.get("dataset", {}).get("config", "default")
-                    in ("default", *langs)
-                )
-            ]
-        else:
-            task_results = [
-                sub_res
-                for sub_res in meta["model-index"][0]["results"]
-                if (sub_res.get("task", {}).get("type", "") in tasks)
-            ]
-        try:
-            out = [
-                {
-                    simplify_dataset_name(res["dataset"]["name"]): [
-                        round(score["value"], 2)
-                        for score in res["metrics"]
-                        if filter_metric_fetched(
-                            simplify_dataset_name(res["dataset"]["name"]),
-                            score["type"],
-                            task_to_metric.get(res["task"]["type"]),
-                            res["dataset"]["split"],
-                        )
-                    ][0]
-                }
-                for res in task_results
-            ]
-        except Exception as e:
-            print("ERROR", model.modelId, e)
-            continue
-        out = {k: v for d in out for k, v in d.items()}
-        out["Model"] = make_clickable_model(model.modelId)
-        # Model & at least one result
-        if len(out) > 1:
-            if add_emb_dim:
-                # The except clause triggers on gated repos, we can use external metadata for those
-                try:
-                    MODEL_INFOS[model.modelId]["dim_seq_size"] = list(get_dim_seq_size(model))
-                except:
-                    name_without_org = model.modelId.split("/")[-1]
-                    # EXTERNAL_MODEL_TO_SIZE[name_without_org] refers to millions of parameters, so for memory usage
-                    # we multiply by 1e6 to get just the number of parameters, then by 4 to get the number of bytes
-                    # given fp32 precision (4 bytes per float), then divide by 1024**3 to get the number of GB
-                    MODEL_INFOS[model.modelId]["dim_seq_size"] = (
-                        EXTERNAL_MODEL_TO_DIM.get(name_without_org, ""),
-                        EXTERNAL_MODEL_TO_SEQLEN.get(name_without_org, ""),
-                        EXTERNAL_MODEL_TO_SIZE.get(name_without_org, ""),
-                        round(
-                            EXTERNAL_MODEL_TO_SIZE[name_without_org]
-                            * 1e6
-                            * 4
-                            / 1024**3,
-                            2,
-                        )
-                        if name_without_org in EXTERNAL_MODEL_TO_SIZE
-                        else "",
-                    )
-                (
-                    out["Embedding Dimensions"],
-                    out["Max Tokens"],
-                    out["Model Size (Million Parameters)"],
-                    out["Memory Usage (GB, fp32)"],
-                ) = tuple(MODEL_INFOS[model.modelId]["dim_seq_size"])
-            df_list.append(out)
+        rows, result_id = get_model_index_rows(
+            model.modelId, meta["model-index"][0]["results"], result_id
+        )
+        score_rows.extend(rows)
+        if "dim_seq_size" not in MODEL_INFOS[model.modelId]:
+            MODEL_INFOS[model.modelId]["dim_seq_size"] = get_model_dim_seq_size(model)
+        # The fetching fails on gated repos, we can use external metadata for those
+        dim, seq, size, memory = (
+            MODEL_INFOS[model.modelId]["dim_seq_size"]
+            or get_external_dim_seq_size(model.modelId)
+        )
+        model_rows.append(
+            {
+                "model_id": model.modelId,
+                "source": "hub",
+                "Model": make_clickable_model(model.modelId),
+                "Model Size (Million Parameters)": size,
+                "Memory Usage (GB, fp32)": memory,
+                "Embedding Dimensions": dim,
+                "Max Tokens": seq,
+            }
+        )
         model_siblings = model.siblings or []
         if (
             model.library_name == "sentence-transformers"
             or "sentence-transformers" in model.tags
             or "modules.json" in {file.rfilename for file in model_siblings}
         ):
-            SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS.add(out["Model"])
+            SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS.add(make_clickable_model(model.modelId))
+
+    # Save & cache MODEL_INFOS
+    save_model_infos([model.modelId for model in models])
+
+    return {
+        "models": model_rows,
+        "scores": pd.DataFrame(score_rows, columns=RESULTS_STORE_COLUMNS),
+    }
+
+
+def get_results_store() -> dict:
+    global RESULTS_STORE
+    if RESULTS_STORE is None:
+        RESULTS_STORE = build_results_store()
+    return RESULTS_STORE
+
+
+def build_score_matrix(results_store: dict, task_to_metric: dict) -> dict:
+    """
+    Resolve the results of a results store with the metrics of `task_to_metric` into a dense model x dataset matrix of
+        scores: the external results with the first metric of their task, and the first result with an expected metric
+        (see `filter_metric_fetched`) of every dataset of the model cards. The results are also kept as "cells", with
+        what `get_matrix_table` selects them by and whether they fail their model (model card results with
+        incompatible metadata or without an expected metric)
+
+    Args:
+        results_store: The results store, see `build_results_store`
+        task_to_metric: The expected metrics of every task
+
+    Returns:
+        A dict with the "scores" matrix (rows in the order of `results_store["models"]`, see
+            `utils.score_matrix.to_score_matrix`), the "datasets" of its columns, the "tasks" and the "keys" (dataset
+            names as reported) the cells refer to, the "name_to_keys" index of the keys by dataset name, and the
+            "cells" arrays
+    """
+    scores = results_store["scores"]
+    models = pd.DataFrame(results_store["models"], columns=["source", "model_id"])
+
+    def get_rows(source: str, model_ids: pd.Series) -> np.ndarray:
+        source_models = models[models["source"] == source].drop_duplicates("model_id", keep="last")
+        return pd.Series(source_models.index, index=source_models["model_id"]).reindex(model_ids).fillna(-1).to_numpy(dtype=np.int64)
+
+    external = scores[scores["source"] == "external"]
+    # Not all models have InstructionRetrieval, other new tasks
+    main_metrics = {task: metrics[0] for task, metrics in task_to_metric.items()}
+    external = external[external["metric"] == external["task"].map(main_metrics)]
+
+    hub = scores[scores["source"] == "hub"]
+    # The rows of the same result (dataset) share their result id
+    result_rows = hub.groupby("result_id", sort=False)
+    results = result_rows.head(1)
+    passing_cache = {}
+
+    def is_passing(dataset, metric, task, split) -> bool:
+        if (dataset, metric, task, split) not in passing_cache:
+            passing_cache[(dataset, metric, task, split)] = (
+                metric is not None
+                and task in task_to_metric
+                and filter_metric_fetched(dataset, metric, task_to_metric[task], split)
+            )
+        return passing_cache[(dataset, metric, task, split)]
+
+    passing = np.fromiter(
+        (is_passing(*row) for row in zip(hub["dataset"], hub["metric"], hub["task"], hub["split"])),
+        dtype=bool,
+        count=len(hub),
+    )
+    first_passing = hub[passing].groupby("result_id", sort=False).head(1).set_index("result_id")
+    is_valid = result_rows["valid"].all().reindex(results["result_id"]).to_numpy(dtype=bool)
+    has_metric = results["result_id"].isin(first_passing.index).to_numpy()
+
+    # The external results, then the model card results
+    num_external, num_hub = len(external), len(results)
+    rows = np.concatenate([get_rows("external", external["model_id"]), get_rows("hub", results["model_id"])])
+    cell_tasks = np.concatenate([external["task"].to_numpy(dtype=object), results["task"].to_numpy(dtype=object)])
+    cell_keys = np.concatenate([external["dataset"].to_numpy(dtype=object), results["dataset_name"].to_numpy(dtype=object)])
+    cell_datasets = np.concatenate(
+        [
+            external["dataset"].to_numpy(dtype=object),
+            first_passing["dataset"].reindex(results["result_id"]).to_numpy(dtype=object),
+        ]
+    )
+    cell_scores = np.concatenate(
+        [
+            external["score"].to_numpy(dtype=float),
+            first_passing["score"].reindex(results["result_id"]).to_numpy(dtype=float),
+        ]
+    )
+    configs = np.concatenate([np.full(num_external, None, dtype=object), results["config"].to_numpy(dtype=object)])
+    errors = np.concatenate(
+        [
+            np.full(num_external, None, dtype=object),
+            np.where(~is_valid, "Incompatible metadata", np.where(~has_metric, "No expected metric", None)),
+        ]
+    )
+    is_hub = np.concatenate([np.zeros(num_external, dtype=bool), np.ones(num_hub, dtype=bool)])
+
+    is_model = rows >= 0
+    rows, cell_tasks, cell_keys, cell_datasets = rows[is_model], cell_tasks[is_model], cell_keys[is_model], cell_datasets[is_model]
+    cell_scores, configs, errors, is_hub = cell_scores[is_model], configs[is_model], errors[is_model], is_hub[is_model]
+    # The failing results have no dataset, nor score
+    is_error = pd.notna(errors)
+    dataset_ids, datasets = pd.factorize(cell_datasets)
+    task_ids, tasks = pd.factorize(cell_tasks)
+    key_ids, keys = pd.factorize(cell_keys)
+
+    # The later results of a model for a dataset replace the earlier ones
+    positions = pd.DataFrame({"row": rows, "dataset": dataset_ids, "is_error": is_error})
+    is_duplicate = ~is_error & positions.duplicated(keep=False).to_numpy()
+    latest = ~is_error & ~positions.duplicated(keep="last").to_numpy()
+    matrix = np.full((len(results_store["models"]), len(datasets)), np.nan)
+    matrix[rows[latest], dataset_ids[latest]] = cell_scores[latest]
+    # The keys of every dataset name, e.g. "MTEB AmazonReviewsClassification (en)" of the model cards and
+    # "AmazonReviewsClassification (en)" of the external results
+    name_to_keys = defaultdict(list)
+    for i, key in enumerate(keys):
+        name_to_keys[simplify_dataset_name(key)].append(i)
+    return {
+        "models": results_store["models"],
+        "scores": to_score_matrix(matrix),
+        "datasets": list(datasets),
+        "tasks": list(tasks),
+        "keys": list(keys),
+        "name_to_keys": dict(name_to_keys),
+        "cells": {
+            "row": rows,
+            "dataset": dataset_ids,
+            "task": task_ids,
+            "key": key_ids,
+            "config": configs,
+            "is_hub": is_hub,
+            "error": errors,
+            "score": cell_scores,
+            "is_duplicate": is_duplicate,
+        },
+    }
+
+
+def get_score_matrix(results_store: dict, task_to_metric: dict) -> dict:
+    """
+    Get the score matrix of a results store for some metrics (see `build_score_matrix`), built once for all the
+        boards with the same metrics and cached in the store
+    """
+    key = tuple((task, tuple(metrics)) for task, metrics in task_to_metric.items())
+    score_matrices = results_store.setdefault("score_matrices", {})
+    if key not in score_matrices:
+        score_matrices[key] = build_score_matrix(results_store, task_to_metric)
+    return score_matrices[key]
+
 
-    # # Save & cache MODEL_INFOS
-    # with open("model_infos.json", "w") as f:
-    #     json.dump(MODEL_INFOS, f)
+def get_matrix_table(score_matrix: dict, tasks: list, langs: list, datasets: list, add_emb_dim: bool) -> pd.DataFrame:
+    """
+    Select the scores of a board in a score matrix, with the masks of its tasks and datasets
+
+    Args:
+        score_matrix: The score matrix, see `build_score_matrix`
+        tasks: The tasks of the board
+        langs: The languages of the board, if it has no `datasets`
+        datasets: The datasets of the board, selected by their exact names (see `simplify_dataset_name`)
+        add_emb_dim: Whether to add the size, embedding dimensions and max tokens of the models
+
+    Returns:
+        A table with a row per model with selected results, unless any selected result fails it, and a column per
+            selected dataset
+    """
+    cells = score_matrix["cells"]
+    selected = np.isin(cells["task"], [i for i, task in enumerate(score_matrix["tasks"]) if task in tasks])
+    if len(datasets) > 0:
+        key_mask = np.zeros(len(score_matrix["keys"]), dtype=bool)
+        key_mask[[key for name in set(datasets) for key in score_matrix["name_to_keys"].get(name, [])]] = True
+        selected &= key_mask[cells["key"]]
+    elif langs:
+        # Would be cleaner to rely on an extra language column instead
+        langs_format = [f"({lang})" for lang in langs]
+        key_mask = np.array(
+            [any([key.split(" ")[-1] in (key, x) for x in langs_format]) for key in score_matrix["keys"]], dtype=bool
+        )
+        config_mask = pd.Series(cells["config"]).isin(("default", *langs)).to_numpy()
+        selected &= np.where(cells["is_hub"], config_mask, key_mask[cells["key"]])
+
+    # A model is skipped if any of its selected results fails, and the first failing result is reported
+    is_error = pd.notna(cells["error"])
+    failed_rows, first_errors = np.unique(cells["row"][selected & is_error], return_index=True)
+    for row, i in zip(failed_rows, np.flatnonzero(selected & is_error)[first_errors]):
+        key = score_matrix["keys"][cells["key"][i]]
+        print("ERROR", score_matrix["models"][row]["model_id"], f"{cells['error'][i]} for {key!r}")
+    selected &= ~is_error & ~np.isin(cells["row"], failed_rows)
+
+    rows = np.unique(cells["row"][selected])
+    columns = np.unique(cells["dataset"][selected])
+    scores = get_scores(score_matrix["scores"], rows, columns)
+    row_positions = np.searchsorted(rows, cells["row"][selected])
+    column_positions = np.searchsorted(columns, cells["dataset"][selected])
+    # Only the selected results of the selected models, e.g. not the results of the other tasks
+    is_selected = np.zeros(scores.shape, dtype=bool)
+    is_selected[row_positions, column_positions] = True
+    scores[~is_selected] = np.nan
+    # The results of a model for the same dataset that the board does not all select: the last selected one wins
+    is_duplicate = cells["is_duplicate"][selected]
+    scores[row_positions[is_duplicate], column_positions[is_duplicate]] = cells["score"][selected][is_duplicate]
+
+    models = [score_matrix["models"][i] for i in rows]
+    model_columns = {"Model": [model["Model"] for model in models]}
+    if add_emb_dim:
+        for column in [
+            "Model Size (Million Parameters)",
+            "Memory Usage (GB, fp32)",
+            "Embedding Dimensions",
+            "Max Tokens",
+        ]:
+            model_columns[column] = [model[column] for model in models]
+    score_columns = {score_matrix["datasets"][column]: scores[:, i] for i, column in enumerate(columns)}
+    return pd.DataFrame({**model_columns, **score_columns})
+
+
+def get_mteb_data(
+    tasks: list = ["Clustering"],
+    langs: list = [],
+    datasets: list = [],
+    add_emb_dim: bool = True,
+    task_to_metric: dict = TASK_TO_METRIC,
+    rank: bool = True,
+    results_store: dict | None = None,
+) -> pd.DataFrame:
+    if results_store is None:
+        results_store = get_results_store()
 
-    df = pd.DataFrame(df_list)
+    # Legacy names changes; Also fetch the old results & merge later
+    datasets = datasets + [LEGACY_DATASET_NAMES[name] for name in datasets if name in LEGACY_DATASET_NAMES]
+
+    df = get_matrix_table(
+        get_score_matrix(results_store, task_to_metric), tasks=tasks, langs=langs, datasets=datasets, add_emb_dim=add_emb_dim
+    )
     # If there are any models that are the same, merge them
     # E.g. if out["Model"] has the same value in two places, merge & take whichever one is not NaN else just take the first one
     df = df.groupby("Model", as_index=False).first()
@@ -569,39 +1066,33 @@ def get_mteb_data(
     df = df[cols]
     if rank:
         df = add_rank(df)
-    if fillna:
-        df.fillna("", inplace=True)
     return df
 
 
 # Get dict with a task list for each task category
 # E.g. {"Classification": ["AmazonMassiveIntentClassification (en)", ...], "PairClassification": ["SprintDuplicateQuestions", ...]}
-def get_mteb_average(task_dict: dict) -> tuple[Any, dict]:
+def get_mteb_average(task_dict: dict, results_store: dict | None = None) -> tuple[Any, dict]:
     all_tasks = reduce(lambda x, y: x + y, task_dict.values())
     DATA_OVERALL = get_mteb_data(
         tasks=list(task_dict.keys()),
         datasets=all_tasks,
-        fillna=False,
         add_emb_dim=True,
         rank=False,
+        results_store=results_store,
     )
     # Debugging:
     # DATA_OVERALL.to_csv("overall.csv")
-    DATA_OVERALL.insert(
-        1,
-        f"Average ({len(all_tasks)} datasets)",
-        DATA_OVERALL[all_tasks].mean(axis=1, skipna=False),
-    )
-
-    for i, (task_category, task_category_list) in enumerate(task_dict.items()):
-        DATA_OVERALL.insert(
-            i + 2,
-            f"{task_category} Average ({len(task_category_list)} datasets)",
-            DATA_OVERALL[task_category_list].mean(axis=1, skipna=False),
-        )
-    DATA_OVERALL.sort_values(
-        f"Average ({len(all_tasks)} datasets)", ascending=False, inplace=True
+    average_columns = {f"Average ({len(all_tasks)} datasets)": all_tasks}
+    for task_category, task_category_list in task_dict.items():
+        average_columns[f"{task_category} Average ({len(task_category_list)} datasets)"] = task_category_list
+    # All the averages at once, from the float64 scores of the datasets
+    score_columns = list(dict.fromkeys(all_tasks))
+    averages = get_masked_means(
+        DATA_OVERALL[score_columns].to_numpy(dtype=np.float64), get_group_masks(score_columns, average_columns)
     )
+    for i, column in enumerate(average_columns):
+        DATA_OVERALL.insert(i + 1, column, averages[:, i])
+    DATA_OVERALL = DATA_OVERALL.sort_values(f"Average ({len(all_tasks)} datasets)", ascending=False)
     # Start ranking from 1
     DATA_OVERALL.insert(0, "Rank", list(range(1, len(DATA_OVERALL) + 1)))
 
@@ -615,11 +1106,11 @@ def get_mteb_average(task_dict: dict) -> tuple[Any, dict]:
             ]
         )
         DATA_TASKS[task_category] = DATA_TASKS[task_category][
-            DATA_TASKS[task_category].iloc[:, 4:].ne("").any(axis=1)
+            DATA_TASKS[task_category].iloc[:, 4:].notna().any(axis=1)
         ]
 
-    # Fill NaN after averaging
-    DATA_OVERALL.fillna("", inplace=True)
+    # The task tables are computed from the rounded float64 averages, the overall table is typed only now
+    DATA_OVERALL = get_typed_table(DATA_OVERALL)
 
     data_overall_rows = [
         "Rank",
@@ -636,7 +1127,7 @@ def get_mteb_average(task_dict: dict) -> tuple[Any, dict]:
         )
 
     DATA_OVERALL = DATA_OVERALL[data_overall_rows]
-    DATA_OVERALL = DATA_OVERALL[DATA_OVERALL.iloc[:, 5:].ne("").any(axis=1)]
+    DATA_OVERALL = DATA_OVERALL[DATA_OVERALL.iloc[:, 5:].notna().any(axis=1)]
 
     return DATA_OVERALL, DATA_TASKS
 
@@ -650,6 +1141,9 @@ def refresh_leaderboard() -> tuple[list, dict]:
     # get external model results and cache them
     # NOTE: if your model results have changed, use this function to refresh them (see inside for details)
     get_external_model_results()
+    # Fetch all results once, every board below is a selection on this store
+    global RESULTS_STORE
+    RESULTS_STORE = build_results_store()
 
     boards_data = {}
     all_data_tasks = []
@@ -669,14 +1163,19 @@ def refresh_leaderboard() -> tuple[list, dict]:
         pbar_tasks.set_description(f"Fetching leaderboard results for {board!r}")
         pbar_tasks.refresh()
         if board_config["has_overall"]:
-            data_overall, data_tasks = get_mteb_average(board_config["tasks"])
+            data_overall, data_tasks = get_mteb_average(
+                task_dict=board_config["tasks"],
+                results_store=RESULTS_STORE,
+            )
             boards_data[board]["data_overall"] = data_overall
             boards_data[board]["data_tasks"] = data_tasks
             all_data_tasks.extend(data_tasks.values())
         else:
             for task_category, task_category_list in board_config["tasks"].items():
                 data_task_category = get_mteb_data(
-                    tasks=[task_category], datasets=task_category_list
+                    tasks=[task_category],
+                    datasets=task_category_list,
+                    results_store=RESULTS_STORE,
                 )
                 boards_data[board]["data_tasks"][task_category] = data_task_category
                 all_data_tasks.append(data_task_category)
@@ -684,6 +1183,43 @@ def refresh_leaderboard() -> tuple[list, dict]:
             TASK_TO_METRIC["Retrieval"] = ["ndcg_at_10"]
     return all_data_tasks, boards_data
 
+
+def get_model_flags(tables: list) -> pd.DataFrame:
+    """
+    Get the model types of all the models of the leaderboard tables as a bitmask of `MODEL_TYPE_FLAGS`, so that the
+        app can filter the models by type without rebuilding the sets of models of each type
+
+    Args:
+        tables: The leaderboard tables, e.g. `all_data_tasks`
+
+    Returns:
+        A DataFrame with the "Model" column of the tables and the "Flags" of each model
+    """
+    def to_clickable(models):
+        # Models from the hub are added to SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS as clickable names already
+        return {
+            model if model.startswith("<a ") else make_clickable_model(model, link=EXTERNAL_MODEL_TO_LINK.get(model, f"https://huggingface.co/spaces/{REPO_ID}"))
+            for model in models
+        }
+
+    model_type_to_models = {
+        "Proprietary": to_clickable(PROPRIETARY_MODELS),
+        "Sentence Transformers": to_clickable(SENTENCE_TRANSFORMERS_COMPATIBLE_MODELS),
+        "Cross-Encoders": to_clickable(CROSS_ENCODERS),
+        "Bi-Encoders": to_clickable(BI_ENCODERS),
+        "Uses Instructions": to_clickable(INSTRUCT_MODELS),
+        "No Instructions": to_clickable(NOINSTRUCT_MODELS),
+    }
+    models = pd.Series(
+        pd.unique(pd.concat([df["Model"] for df in tables if isinstance(df, pd.DataFrame)], ignore_index=True)),
+        dtype=object,
+    )
+    flags = pd.Series(0, index=models.index, dtype="int64")
+    for model_type, type_models in model_type_to_models.items():
+        flags[models.isin(type_models)] |= MODEL_TYPE_FLAGS[model_type]
+    return pd.DataFrame({"Model": models, "Flags": flags})
+
+
 def write_out_results(item: dict, item_name: str) -> None:
     """
     Due to their complex structure, let's recursively create subfolders until we reach the end
@@ -713,6 +1249,8 @@ def write_out_results(item: dict, item_name: str) -> None:
         print(f"Saving {main_folder} to {main_folder}/default.jsonl")
         os.makedirs(main_folder, exist_ok=True)
 
+        # The legacy tables have "" for the missing values
+        item = format_table(item)
         if "index" not in item.columns:
             item.reset_index(inplace=True)
         item.to_json(f"{main_folder}/default.jsonl", orient="records", lines=True)
@@ -770,8 +1308,6 @@ def load_results(data_path: str) -> list | dict | pd.DataFrame | str | None:
         df = pd.read_json(data_path, orient="records", lines=True)
         if "index" in df.columns:
             df = df.set_index("index")
-        if "Memory Usage (GB, fp32)" in df.columns:
-            df["Memory Usage (GB, fp32)"] = df["Memory Usage (GB, fp32)"].map(lambda value: round(value, 2) if isinstance(value, float) else value)
         return df
 
     else:
@@ -783,16 +1319,64 @@ def load_results(data_path: str) -> list | dict | pd.DataFrame | str | None:
             return data
 
 
+def get_all_data_tasks(boards_data: dict) -> list:
+    """
+    Get the list of all the task tables of the boards, as returned by `refresh_leaderboard`
+
+    Args:
+        boards_data: The boards data, as returned by `refresh_leaderboard`
+
+    Returns:
+        The task tables of every board
+    """
+    return [df for board_data in boards_data.values() for df in board_data["data_tasks"].values()]
+
+
+def load_leaderboard_results() -> tuple[list, dict, pd.DataFrame]:
+    """
+    Load the results saved by `refresh.py`, from the snapshot if there is one and otherwise from the legacy
+        `boards_data` and `model_flags` folders
+
+    Returns:
+        all_data_tasks, boards_data, model_flags
+    """
+    if snapshot_exists(SNAPSHOT_PATH):
+        snapshot = load_snapshot(SNAPSHOT_PATH)
+        boards_data, model_flags = snapshot["boards_data"], snapshot.get("model_flags")
+    else:
+        boards_data = load_results("boards_data")
+        model_flags = load_results("model_flags") if os.path.exists("model_flags") else None
+    # The legacy tables, and the ones of older snapshots, have "" for the missing values
+    for board_data in boards_data.values():
+        if isinstance(board_data["data_overall"], pd.DataFrame):
+            board_data["data_overall"] = get_typed_table(board_data["data_overall"])
+        board_data["data_tasks"] = {
+            task_category: get_typed_table(df) for task_category, df in board_data["data_tasks"].items()
+        }
+    # `all_data_tasks` only holds tables of `boards_data`
+    all_data_tasks = get_all_data_tasks(boards_data)
+    if model_flags is None:
+        # Results saved before the model flags, only the model types of the model metadata are known
+        model_flags = get_model_flags(all_data_tasks)
+    return all_data_tasks, boards_data, model_flags
+
+
 if __name__ == "__main__":
     print("Refreshing leaderboard statistics...")
     all_data_tasks, boards_data = refresh_leaderboard()
+    model_flags = get_model_flags(all_data_tasks)
     print("Done calculating, saving...")
-    # save them so that the leaderboard can use them.  They're quite complex though
-    #   but we can't use pickle files because of git-lfs.
-    write_out_results(all_data_tasks, "all_data_tasks")
-    write_out_results(boards_data, "boards_data")
+    # save them so that the leaderboard can use them, as one memory-mapped snapshot
+    #   (Arrow tables, no pickle files because of git-lfs). The tables of `all_data_tasks` are the ones of
+    #   `boards_data`, the snapshot stores them once.
+    write_snapshot({"all_data_tasks": all_data_tasks, "boards_data": boards_data, "model_flags": model_flags}, SNAPSHOT_PATH)
+    if WRITE_LEGACY_RESULTS:
+        write_out_results(boards_data, "boards_data")
+        write_out_results(model_flags, "model_flags")
+    if STATIC_EXPORT_PATH:
+        # for serving the tables from a static file server or CDN
+        write_static_export(boards_data, STATIC_EXPORT_PATH)
 
     # to load them use
-    # all_data_tasks = load_results("all_data_tasks")
-    # boards_data = load_results("boards_data")
+    # all_data_tasks, boards_data, model_flags = load_leaderboard_results()
     print("Done saving results!")
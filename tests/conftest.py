@@ -0,0 +1,30 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import refresh
+
+
+@pytest.fixture
+def build_store(tmp_path, monkeypatch):
+    '''
+    Build a results store with `refresh.build_results_store` from external results and model card metadata (by model
+    id), without any network access.
+    '''
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(refresh, "fetch_model_infos", lambda models: None)
+    monkeypatch.setattr(refresh, "save_model_infos", lambda model_ids: None)
+
+    def build(external_results: dict, model_cards: dict) -> dict:
+        with open(tmp_path / "EXTERNAL_MODEL_RESULTS.json", "w") as f:
+            json.dump(external_results, f)
+        models = [
+            SimpleNamespace(modelId=model_id, siblings=[], library_name=None, tags=[]) for model_id in model_cards
+        ]
+        monkeypatch.setattr(refresh, "list_models", lambda **kwargs: iter(models))
+        monkeypatch.setattr(refresh, "download_or_use_cache", lambda model_id: model_cards[model_id])
+        monkeypatch.setattr(refresh, "MODEL_INFOS", {model_id: {"dim_seq_size": ["", "", "", ""]} for model_id in model_cards})
+        return refresh.build_results_store()
+
+    return build
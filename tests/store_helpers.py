@@ -0,0 +1,36 @@
+import refresh
+
+# A small board, with the datasets of two tasks
+TASK_DICT = {
+    "Classification": ["Banking77Classification", "EmotionClassification"],
+    "Clustering": ["ArxivClusteringS2S", "RedditClustering"],
+}
+DATASET_TO_TASK = {dataset: task for task, datasets in TASK_DICT.items() for dataset in datasets}
+
+
+def make_external_results(model_scores: dict) -> dict:
+    '''The EXTERNAL_MODEL_RESULTS.json entries of models, from their scores by dataset.'''
+    results = {}
+    for model, scores in model_scores.items():
+        model_results = results.setdefault(model, {})
+        for dataset, score in scores.items():
+            task = DATASET_TO_TASK[dataset]
+            metric = refresh.TASK_TO_METRIC[task][0]
+            entries = model_results.setdefault(task, {}).setdefault(metric, [{"Model": refresh.make_clickable_model(model)}])
+            entries[0][dataset] = score
+    return results
+
+
+def make_model_card(scores: dict) -> dict:
+    '''The metadata of a model card with a model-index of scores by dataset.'''
+    results = []
+    for dataset, score in scores.items():
+        task = DATASET_TO_TASK[dataset]
+        results.append(
+            {
+                "task": {"type": task},
+                "dataset": {"name": f"MTEB {dataset}", "config": "default", "split": "test"},
+                "metrics": [{"type": "f1_weighted", "value": 1.0}, {"type": refresh.TASK_TO_METRIC[task][0], "value": score}],
+            }
+        )
+    return {"model-index": [{"results": results}]}
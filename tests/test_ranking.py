@@ -0,0 +1,46 @@
+import numpy as np
+
+import refresh
+from store_helpers import TASK_DICT, make_external_results, make_model_card
+
+SCORES = {
+    "org/model-a": {"Banking77Classification": 80.0, "EmotionClassification": 50.0, "ArxivClusteringS2S": 40.0, "RedditClustering": 55.0},
+    "org/model-b": {"Banking77Classification": 70.0, "EmotionClassification": 45.0, "ArxivClusteringS2S": 35.0, "RedditClustering": 50.0},
+    "org/model-c": {"Banking77Classification": 75.0, "EmotionClassification": 48.0, "ArxivClusteringS2S": 38.0, "RedditClustering": 52.0},
+}
+EXTERNAL_SCORES = {
+    "external-model": {"Banking77Classification": 72.0, "EmotionClassification": 46.0, "ArxivClusteringS2S": 36.0, "RedditClustering": 51.0},
+}
+
+
+def get_expected_table(scores: dict, datasets: list) -> list:
+    '''The (model, average) rows of a table ranked from scratch.'''
+    rows = [(refresh.make_clickable_model(model), np.mean([model_scores[d] for d in datasets])) for model, model_scores in scores.items()]
+    return [(model, round(average, 2)) for model, average in sorted(rows, key=lambda row: -row[1])]
+
+
+def get_table(df, average_column: str) -> list:
+    return [(model, round(float(average), 2)) for model, average in zip(df["Model"], df[average_column])]
+
+
+def check_board(build_store, scores: dict):
+    store = build_store(make_external_results(EXTERNAL_SCORES), {model: make_model_card(s) for model, s in scores.items()})
+    overall, tasks = refresh.get_mteb_average(TASK_DICT, results_store=store)
+    all_scores = {**scores, **EXTERNAL_SCORES}
+    all_datasets = [dataset for datasets in TASK_DICT.values() for dataset in datasets]
+    assert get_table(overall, "Average (4 datasets)") == get_expected_table(all_scores, all_datasets)
+    assert list(overall["Rank"]) == list(range(1, len(all_scores) + 1))
+    for task, datasets in TASK_DICT.items():
+        assert get_table(tasks[task], "Average") == get_expected_table(all_scores, datasets)
+        assert list(tasks[task]["Rank"]) == list(range(1, len(all_scores) + 1))
+
+
+def test_ranking_follows_changed_results(build_store):
+    scores = {model: dict(model_scores) for model, model_scores in SCORES.items()}
+    check_board(build_store, scores)
+
+    # A new model, a changed score and a removed model: every table is ranked again from the new results
+    scores["org/model-d"] = {"Banking77Classification": 78.0, "EmotionClassification": 49.0, "ArxivClusteringS2S": 39.0, "RedditClustering": 53.0}
+    scores["org/model-b"]["Banking77Classification"] = 95.0
+    del scores["org/model-c"]
+    check_board(build_store, scores)
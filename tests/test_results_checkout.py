@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import refresh
+from utils.results_checkout import load_results_dir, select_revision_dir
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "results_checkout")
+
+
+def set_revision_time(checkout: str, model: str, revision: str, timestamp: float):
+    revision_dir = os.path.join(checkout, "results", model, revision)
+    for file in os.listdir(revision_dir):
+        os.utime(os.path.join(revision_dir, file), (timestamp, timestamp))
+
+
+@pytest.fixture
+def checkout(tmp_path):
+    # Outside of a git repository, the revisions are ordered by the modification times of their files
+    path = str(tmp_path / "checkout")
+    shutil.copytree(FIXTURE_PATH, path)
+    # The revision that sorts first by name is the latest one
+    set_revision_time(path, "model-a", "zzz999", 1_000_000)
+    set_revision_time(path, "model-a", "aaa111", 2_000_000)
+    return path
+
+
+def test_select_revision_dir_latest(checkout):
+    results_dir = os.path.join(checkout, "results", "model-a")
+    assert select_revision_dir(results_dir) == os.path.join(results_dir, "aaa111")
+    assert [row["score"] for row in load_results_dir(select_revision_dir(results_dir))] == [85.0]
+
+
+def test_select_revision_dir_explicit(checkout):
+    results_dir = os.path.join(checkout, "results", "model-a")
+    assert select_revision_dir(results_dir, "zzz999") == os.path.join(results_dir, "zzz999")
+    assert select_revision_dir(results_dir, "missing") is None
+
+
+def test_external_model_results_reparse_changed_models(checkout, tmp_path, monkeypatch):
+    workdir = tmp_path / "workdir"
+    workdir.mkdir()
+    monkeypatch.chdir(workdir)
+    monkeypatch.setattr(refresh, "RESULTS_CHECKOUT", checkout)
+    monkeypatch.setattr(refresh, "EXTERNAL_MODELS", {"model-a", "model-b"})
+    parsed = []
+
+    def load_results_dir_spy(results_dir):
+        parsed.append(os.path.relpath(results_dir, checkout))
+        return load_results_dir(results_dir)
+
+    monkeypatch.setattr(refresh, "load_results_dir", load_results_dir_spy)
+
+    results = refresh.get_external_model_results()
+    assert sorted(parsed) == [os.path.join("results", "model-a", "aaa111"), os.path.join("results", "model-b", "b1b1b1")]
+    assert results["model-a"]["Classification"]["accuracy"][0]["Banking77Classification"] == 85.0
+    assert results["model-b"]["Classification"]["accuracy"][0]["Banking77Classification"] == 70.0
+
+    # Only the model with a changed result file is parsed again
+    filepath = os.path.join(checkout, "results", "model-a", "aaa111", "Banking77Classification.json")
+    with open(filepath) as f:
+        res_dict = json.load(f)
+    res_dict["scores"]["test"][0]["accuracy"] = 0.9
+    with open(filepath, "w") as f:
+        json.dump(res_dict, f)
+    parsed.clear()
+
+    results = refresh.get_external_model_results()
+    assert parsed == [os.path.join("results", "model-a", "aaa111")]
+    assert results["model-a"]["Classification"]["accuracy"] == [
+        {"Model": results["model-a"]["Classification"]["accuracy"][0]["Model"], "Banking77Classification": 90.0}
+    ]
+    assert results["model-b"]["Classification"]["accuracy"][0]["Banking77Classification"] == 70.0
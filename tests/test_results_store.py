@@ -0,0 +1,117 @@
+import pandas as pd
+import pytest
+
+import refresh
+from store_helpers import TASK_DICT, make_external_results, make_model_card
+
+BASE_COLUMNS = ["Model", "Model Size (Million Parameters)", "Memory Usage (GB, fp32)", "Embedding Dimensions", "Max Tokens"]
+EXTERNAL_SCORES = {
+    "external-model": {"Banking77Classification": 72.5, "EmotionClassification": 46.25, "ArxivClusteringS2S": 36.0, "RedditClustering": 51.75},
+    "external-classifier": {"Banking77Classification": 61.0, "EmotionClassification": 41.5},
+}
+MODEL_CARDS = {
+    "org/model-a": make_model_card(
+        {"Banking77Classification": 80.123, "EmotionClassification": 50.0, "ArxivClusteringS2S": 40.456, "RedditClustering": 55.5}
+    ),
+    "org/model-b": make_model_card({"Banking77Classification": 70.0, "EmotionClassification": 45.678}),
+    # No expected metric for a selected dataset: the model is skipped
+    "org/model-failing": make_model_card({"Banking77Classification": 75.0, "EmotionClassification": 48.0}),
+    # A failing result for a dataset whose name only contains the name of a selected dataset
+    "org/model-suffix": make_model_card({"Banking77Classification": 77.0, "EmotionClassification": 47.0}),
+}
+MODEL_CARDS["org/model-a"]["model-index"][0]["results"][3]["dataset"]["name"] = "MTEB RedditClustering (default)"
+MODEL_CARDS["org/model-failing"]["model-index"][0]["results"][1]["metrics"] = [{"type": "f1_weighted", "value": 1.0}]
+MODEL_CARDS["org/model-suffix"]["model-index"][0]["results"].append(
+    {
+        "task": {"type": "Classification"},
+        "dataset": {"name": "MTEB Banking77ClassificationExtended", "config": "default", "split": "test"},
+        "metrics": [{"type": "f1_weighted", "value": 1.0}],
+    }
+)
+
+
+def get_legacy_table(external_results: dict, model_cards: dict, tasks: list, datasets: list) -> pd.DataFrame:
+    '''
+    The unranked table of a board as `get_mteb_data` built it before the results store: one loop over the external
+    results and the model cards per board, selecting the datasets whose names contain a name of `datasets`.
+    '''
+    task_to_metric = refresh.TASK_TO_METRIC
+    df_list = []
+    for model in external_results:
+        results_list = []
+        for task in tasks:
+            if task not in external_results[model]:
+                continue
+            if task_to_metric[task][0] not in external_results[model][task]:
+                continue
+            results_list += external_results[model][task][task_to_metric[task][0]]
+        res = {k: v for d in results_list for k, v in d.items() if (k == "Model") or any([x in k for x in datasets])}
+        if len(res) > 1:
+            res.update({column: "" for column in BASE_COLUMNS[1:]})
+            df_list.append(res)
+    for model_id, meta in model_cards.items():
+        task_results = [
+            sub_res
+            for sub_res in meta["model-index"][0]["results"]
+            if (sub_res.get("task", {}).get("type", "") in tasks)
+            and any([x in sub_res.get("dataset", {}).get("name", "") for x in datasets])
+        ]
+        try:
+            out = [
+                {
+                    refresh.simplify_dataset_name(res["dataset"]["name"]): [
+                        round(score["value"], 2)
+                        for score in res["metrics"]
+                        if refresh.filter_metric_fetched(
+                            refresh.simplify_dataset_name(res["dataset"]["name"]),
+                            score["type"],
+                            task_to_metric.get(res["task"]["type"]),
+                            res["dataset"]["split"],
+                        )
+                    ][0]
+                }
+                for res in task_results
+            ]
+        except Exception:
+            continue
+        out = {k: v for d in out for k, v in d.items()}
+        out["Model"] = refresh.make_clickable_model(model_id)
+        if len(out) > 1:
+            out.update({column: "" for column in BASE_COLUMNS[1:]})
+            df_list.append(out)
+    df = pd.DataFrame(df_list).groupby("Model", as_index=False).first()
+    cols = [column for column in BASE_COLUMNS if column in df.columns]
+    cols += sorted(column for column in df.columns if column in datasets)
+    return df[cols]
+
+
+def sort_table(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values("Model").reset_index(drop=True)
+
+
+@pytest.mark.parametrize("tasks", [[task] for task in TASK_DICT] + [list(TASK_DICT)])
+def test_store_tables_match_legacy_tables(build_store, tasks):
+    external_results = make_external_results(EXTERNAL_SCORES)
+    store = build_store(external_results, MODEL_CARDS)
+    datasets = [dataset for task in tasks for dataset in TASK_DICT[task]]
+    table = refresh.get_mteb_data(tasks=tasks, datasets=list(datasets), rank=False, results_store=store)
+    legacy_table = get_legacy_table(external_results, MODEL_CARDS, tasks, datasets)
+
+    # With the exact dataset names, the failing "Banking77ClassificationExtended" result is not selected anymore, so
+    # the model is not skipped
+    suffix_model = refresh.make_clickable_model("org/model-suffix")
+    assert suffix_model not in set(legacy_table["Model"])
+    suffix_row = table[table["Model"] == suffix_model]
+    assert len(suffix_row) == (1 if "Classification" in tasks else 0)
+    if len(suffix_row):
+        assert suffix_row["Banking77Classification"].item() == 77.0
+    table = table[table["Model"] != suffix_model]
+
+    assert refresh.make_clickable_model("org/model-failing") not in set(table["Model"])
+    pd.testing.assert_frame_equal(sort_table(table), sort_table(legacy_table), check_dtype=False, check_exact=True)
+    # Ranked the same way
+    pd.testing.assert_frame_equal(
+        refresh.add_rank(sort_table(table)).reset_index(drop=True),
+        refresh.add_rank(sort_table(legacy_table)).reset_index(drop=True),
+        check_dtype=False,
+    )
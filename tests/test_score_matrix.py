@@ -0,0 +1,17 @@
+import numpy as np
+import pandas as pd
+
+from utils.score_matrix import get_group_masks, get_masked_means
+
+
+def test_masked_means_match_pandas_row_means():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.uniform(0, 100, (50, 6)).round(2), columns=list("abcdef"))
+    df[df > 90] = np.nan
+    groups = {"all": list("abcdef"), "first": ["a", "b", "c"], "last": ["d", "e", "f"], "twice": ["a", "a", "b"], "empty": []}
+    means = get_masked_means(df.to_numpy(), get_group_masks(list(df.columns), groups))
+    for j, columns in enumerate(groups.values()):
+        expected = df[columns].mean(axis=1, skipna=False).to_numpy()
+        # Summed in another order than pandas: equal up to the last bit, and missing as soon as a score is missing
+        np.testing.assert_allclose(means[:, j], expected, rtol=1e-15, atol=0)
+        np.testing.assert_array_equal(np.isnan(means[:, j]), np.isnan(expected))
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+import types
+
+import huggingface_hub
+from datasets import Dataset, DatasetDict
+from datasets import load_dataset as _load_dataset
+from huggingface_hub.hf_api import get_hf_file_metadata as _get_hf_file_metadata
+from huggingface_hub.hf_api import get_safetensors_metadata as _get_safetensors_metadata
+
+from envs import API, HUB_REPLAY_LATENCY, HUB_REPLAY_MODE, HUB_REPLAY_PATH
+
+# Stand-ins for the Hub calls of refresh.py. With HUB_REPLAY_MODE=record, the responses of a real run are saved in
+# HUB_REPLAY_PATH; with HUB_REPLAY_MODE=replay, they are served from there (after HUB_REPLAY_LATENCY seconds) without
+# any network access. Without HUB_REPLAY_MODE, the calls go straight to the Hub.
+
+
+def get_call_key(name: str, args: tuple, kwargs: dict) -> str:
+    call = repr((name, args, sorted(kwargs.items())))
+    return hashlib.sha256(call.encode()).hexdigest()
+
+
+def to_picklable_error(error: Exception) -> Exception:
+    try:
+        pickle.loads(pickle.dumps(error))
+        return error
+    except Exception:
+        # Errors holding e.g. an HTTP response; keep the message only
+        return Exception(f"{type(error).__name__}: {error}")
+
+
+def save_record(path: str, record: tuple) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Calls can be recorded from several threads, never leave half-written records
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(record, f)
+    os.replace(tmp_path, path)
+
+
+def replayable(func, name: str | None = None, to_record=None, from_record=None):
+    '''
+    Wrap a function calling the Hub so that its responses can be recorded and replayed.
+    `to_record(value, record_dir)` and `from_record(value, record_dir)` convert responses that cannot be pickled as is.
+    '''
+    name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if HUB_REPLAY_MODE is None:
+            return func(*args, **kwargs)
+
+        record_dir = os.path.join(HUB_REPLAY_PATH, name)
+        record_path = os.path.join(record_dir, get_call_key(name, args, kwargs) + ".pkl")
+        if HUB_REPLAY_MODE == "replay":
+            if HUB_REPLAY_LATENCY > 0:
+                time.sleep(HUB_REPLAY_LATENCY)
+            if not os.path.exists(record_path):
+                raise FileNotFoundError(f"No recorded response for {name}(*{args}, **{kwargs}) in {HUB_REPLAY_PATH}")
+            with open(record_path, "rb") as f:
+                is_error, value = pickle.load(f)
+            if is_error:
+                raise value
+            return from_record(value, record_dir) if from_record is not None else value
+
+        elif HUB_REPLAY_MODE == "record":
+            try:
+                value = func(*args, **kwargs)
+            except Exception as e:
+                save_record(record_path, (True, to_picklable_error(e)))
+                raise
+            if isinstance(value, types.GeneratorType):
+                value = list(value)
+            save_record(record_path, (False, to_record(value, record_dir) if to_record is not None else value))
+            return value
+
+        raise ValueError(f"Unknown HUB_REPLAY_MODE {HUB_REPLAY_MODE!r}, expected 'record' or 'replay'")
+
+    return wrapper
+
+
+def record_file(path: str, record_dir: str) -> str:
+    file_dir = os.path.join(record_dir, hashlib.sha256(path.encode()).hexdigest())
+    os.makedirs(file_dir, exist_ok=True)
+    shutil.copy(path, os.path.join(file_dir, os.path.basename(path)))
+    return os.path.join(os.path.basename(file_dir), os.path.basename(path))
+
+
+def replay_file(path: str, record_dir: str) -> str:
+    return os.path.join(record_dir, path)
+
+
+def record_dataset(ds: DatasetDict, record_dir: str) -> dict:
+    return {split: ds[split].to_dict() for split in ds}
+
+
+def replay_dataset(ds: dict, record_dir: str) -> DatasetDict:
+    return DatasetDict({split: Dataset.from_dict(split_ds) for split, split_ds in ds.items()})
+
+
+list_models = replayable(API.list_models, name="list_models")
+hf_hub_download = replayable(huggingface_hub.hf_hub_download, to_record=record_file, from_record=replay_file)
+get_safetensors_metadata = replayable(_get_safetensors_metadata)
+get_hf_file_metadata = replayable(_get_hf_file_metadata)
+load_dataset = replayable(_load_dataset, to_record=record_dataset, from_record=replay_dataset)
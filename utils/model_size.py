@@ -1,8 +1,9 @@
 import json
 import re
 import traceback
-from huggingface_hub.hf_api import ModelInfo, get_safetensors_metadata, model_info as get_model_info, get_hf_file_metadata, hf_hub_url
-from huggingface_hub import hf_hub_download
+from huggingface_hub.hf_api import ModelInfo, model_info as get_model_info, hf_hub_url
+
+from utils.hub_replay import get_hf_file_metadata, get_safetensors_metadata, hf_hub_download
 
 # Map model IDs to the number of bytes used for one parameter. So, 4 bytes for fp32, 2 bytes for fp16, etc.
 # By default, we assume that the model is stored in fp32.
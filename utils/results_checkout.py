@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+
+# Keys of the result files that are not scores
+SKIP_KEYS = {"std", "evaluation_time", "main_score", "threshold", "hf_subset", "languages"}
+# Nested metrics of the legacy format, e.g. {"cos_sim": {"spearman": 0.8}}
+METRIC_GROUPS = {"cos_sim", "cosine", "euclidean", "manhattan", "dot", "dot_product", "max"}
+# Splits to use for a dataset, in order of preference. The "long" split of BrightRetrieval is always kept.
+SPLIT_PREFERENCE = ["test", "dev", "validation", "test.full", "standard", "train"]
+# Datasets that are not evaluated on their test split
+DATASET_TO_SPLIT = {
+    "MSMARCO": "dev",
+}
+
+
+def find_model_results_dir(checkout_path: str, model: str, org: str | None = None) -> str | None:
+    '''Get the folder with the results of `model` in a local checkout of the results repository.'''
+    for name in [model, f"{org}__{model}" if org else None]:
+        if name is None:
+            continue
+        for path in [os.path.join(checkout_path, "results", name), os.path.join(checkout_path, name)]:
+            if os.path.isdir(path):
+                return path
+    return None
+
+
+def get_revision_time(results_dir: str, revision: str) -> float:
+    '''
+    Get when a revision folder of a model was last committed to the results repository, or, if the checkout is not a
+    git repository, when its result files were last modified.
+    '''
+    try:
+        out = subprocess.run(
+            ["git", "log", "-1", "--format=%ct", "--", revision],
+            cwd=results_dir,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        if out:
+            return float(out)
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    filepaths = list_result_files(os.path.join(results_dir, revision))
+    return max([os.path.getmtime(filepath) for filepath in filepaths], default=0.0)
+
+
+def select_revision_dir(results_dir: str, revision: str | None = None) -> str | None:
+    '''
+    Get the folder of the results of one revision of a model (`<model>/<revision>/`): `revision` if given, else the
+    latest one committed (see `get_revision_time`). The results of the different revisions are never merged. A model
+    folder without revision folders (legacy layout) is returned as is.
+    '''
+    revisions = sorted(name for name in os.listdir(results_dir) if os.path.isdir(os.path.join(results_dir, name)))
+    if revision is not None:
+        return os.path.join(results_dir, revision) if revision in revisions else None
+    if not revisions:
+        return results_dir
+    if len(revisions) > 1:
+        # Ties are broken by name, so the selection does not depend on the file system order
+        revisions = sorted(revisions, key=lambda name: get_revision_time(results_dir, name))
+    return os.path.join(results_dir, revisions[-1])
+
+
+def list_result_files(results_dir: str) -> list:
+    filepaths = []
+    for root, _, files in os.walk(results_dir):
+        for file in files:
+            if file.endswith(".json") and file != "model_meta.json":
+                filepaths.append(os.path.join(root, file))
+    return sorted(filepaths)
+
+
+def hash_results_dir(results_dir: str) -> str:
+    '''Content hash of all the result files of a model, used to only re-parse the models that changed.'''
+    sha = hashlib.sha256()
+    for filepath in list_result_files(results_dir):
+        sha.update(os.path.relpath(filepath, results_dir).encode())
+        with open(filepath, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def flatten_scores(scores: dict, prefix: str = "") -> list:
+    '''Flatten nested scores, e.g. {"cos_sim": {"spearman": 0.8}} -> [("cos_sim_spearman", 0.8)]'''
+    out = []
+    for metric, score in scores.items():
+        if metric in SKIP_KEYS:
+            continue
+        metric = f"{prefix}_{metric}" if prefix else metric
+        if isinstance(score, dict):
+            out.extend(flatten_scores(score, metric))
+        elif isinstance(score, (int, float)) and not isinstance(score, bool):
+            out.append((metric, score))
+    return out
+
+
+def parse_result_file(filepath: str) -> list:
+    '''
+    Parse one result file into rows like the ones of the results dataset, i.e. with the keys
+    "mteb_dataset_name", "hf_subset", "split", "metric" and "score" (in percent).
+    Supports both the current format ({"task_name": ..., "scores": {split: [{"hf_subset": ..., ...}]}})
+    and the legacy one ({"mteb_dataset_name": ..., split: {metric: ...} or {split: {lang: {metric: ...}}}).
+    '''
+    with open(filepath, encoding="utf-8") as f:
+        res_dict = json.load(f)
+
+    rows = []
+    if "scores" in res_dict:
+        dataset_name = res_dict.get("task_name", os.path.splitext(os.path.basename(filepath))[0])
+        for split, split_scores in res_dict["scores"].items():
+            for subset_scores in split_scores:
+                hf_subset = subset_scores.get("hf_subset", "default")
+                for metric, score in flatten_scores(subset_scores):
+                    rows.append((dataset_name, hf_subset, split, metric, score))
+    else:
+        dataset_name = res_dict.get("mteb_dataset_name", os.path.splitext(os.path.basename(filepath))[0])
+        for split, split_scores in res_dict.items():
+            if not isinstance(split_scores, dict):
+                continue
+            # Multilingual datasets are keyed by language, the other nested keys are groups of metrics
+            if any(isinstance(v, dict) and k not in METRIC_GROUPS for k, v in split_scores.items()):
+                subsets = {k: v for k, v in split_scores.items() if isinstance(v, dict)}
+            else:
+                subsets = {"default": split_scores}
+            for hf_subset, subset_scores in subsets.items():
+                for metric, score in flatten_scores(subset_scores):
+                    rows.append((dataset_name, hf_subset, split, metric, score))
+
+    # Only keep one evaluation split per dataset (and the "long" split of BrightRetrieval)
+    splits = {row[2] for row in rows}
+    preference = [DATASET_TO_SPLIT[dataset_name]] if dataset_name in DATASET_TO_SPLIT else []
+    selected_split = next((split for split in preference + SPLIT_PREFERENCE if split in splits), None)
+    return [
+        {
+            "mteb_dataset_name": dataset_name,
+            "hf_subset": hf_subset,
+            "split": split,
+            "metric": metric,
+            "score": score * 100,
+        }
+        for dataset_name, hf_subset, split, metric, score in rows
+        if split == selected_split or split == "long"
+    ]
+
+
+def load_results_dir(results_dir: str) -> list:
+    '''Get all the result rows of a model from its folder in the results repository.'''
+    rows = []
+    for filepath in list_result_files(results_dir):
+        try:
+            rows.extend(parse_result_file(filepath))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            print(f"WARNING: Could not parse {filepath}: {e}")
+    return rows
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+
+from utils.table_format import SCORE_DECIMALS
+
+# The scores of all the models on all the datasets are resolved once per refresh into a dense model x dataset matrix
+# (see `refresh.build_score_matrix`), from which every board selects its rows and columns. The scores are rounded to
+# SCORE_DECIMALS when they are ingested, so the matrix is float32 and the exact float64 scores are restored by
+# rounding again.
+# The averages of the boards are masked reductions of their float64 scores: one matrix product with a (dataset x average)
+# mask gives every average of every model at once (see `get_masked_means`).
+
+
+def to_score_matrix(values: np.ndarray) -> np.ndarray:
+    '''Store a float64 score matrix as float32, unless some scores could not be restored exactly (see `get_scores`).'''
+    compact = values.astype(np.float32)
+    restored = compact.astype(np.float64).round(SCORE_DECIMALS)
+    if np.array_equal(restored, values, equal_nan=True):
+        return compact
+    return values
+
+
+def get_scores(matrix: np.ndarray, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+    '''Get the float64 scores of some rows and columns of a score matrix.'''
+    scores = matrix[np.ix_(rows, columns)].astype(np.float64)
+    if matrix.dtype == np.float32:
+        scores = scores.round(SCORE_DECIMALS)
+    return scores
+
+
+def get_group_masks(columns: list, groups: dict) -> np.ndarray:
+    '''Get the (columns x groups) matrix counting how many times each group lists each column.'''
+    positions = {column: i for i, column in enumerate(columns)}
+    masks = np.zeros((len(columns), len(groups)))
+    for j, group_columns in enumerate(groups.values()):
+        np.add.at(masks[:, j], [positions[column] for column in group_columns], 1.0)
+    return masks
+
+
+def get_masked_means(scores: np.ndarray, masks: np.ndarray) -> np.ndarray:
+    '''
+    Average the float64 scores of every row over the columns of every group of `masks` (see `get_group_masks`). A row
+    missing a score of a group has a NaN mean for it, as with `mean(skipna=False)`. The sums are matrix products, so an
+    average can differ from the pandas row mean in its last bit, i.e. only for the values rounding on a .xx5 boundary.
+    '''
+    missing = np.isnan(scores)
+    sums = np.where(missing, 0.0, scores) @ masks
+    counts = masks.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+    means[(missing @ masks) > 0] = np.nan
+    return means
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+
+import numpy as np
+import pandas as pd
+
+MODEL_NAME_PATTERN = re.compile("<a .+?>(.+)</a>")
+# Queries with these characters are regular expressions (as for `str.contains`), they can't use the trigram index
+REGEX_CHARACTERS = set(".^$*+?{}[]\\|()")
+
+
+def get_model_name(model: str) -> str:
+    '''Get the lowercase name of a model from its (HTML anchor) "Model" cell.'''
+    match = MODEL_NAME_PATTERN.match(model)
+    return (match.group(1) if match else model).lower()
+
+
+def get_trigrams(text: str) -> set:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def build_search_index(tables: list) -> dict:
+    '''
+    Index the model names of the tables once: the unique lowercase names, the id of the name of every "Model" cell
+    and, for every trigram, the ids of the names containing it.
+    '''
+    model_to_id = {}
+    names = []
+    for df in tables:
+        for model in df["Model"].unique():
+            if model not in model_to_id:
+                model_to_id[model] = len(names)
+                names.append(get_model_name(model))
+
+    trigram_to_ids = {}
+    for name_id, name in enumerate(names):
+        for trigram in get_trigrams(name):
+            trigram_to_ids.setdefault(trigram, []).append(name_id)
+    return {
+        "names": names,
+        "model_to_id": model_to_id,
+        "trigram_to_ids": {trigram: np.array(ids) for trigram, ids in trigram_to_ids.items()},
+    }
+
+
+def match_query(query: str, name: str) -> bool:
+    if REGEX_CHARACTERS & set(query):
+        return re.search(query, name) is not None
+    return query in name
+
+
+def search_names(search_index: dict, search_query: str) -> np.ndarray:
+    '''
+    Get which names match a search query, as a boolean array indexed by name id. The query is a list of
+    `;`-separated queries, a name matches if it contains any of them.
+    '''
+    names = search_index["names"]
+    matches = np.zeros(len(names), dtype=bool)
+    for query in search_query.lower().split(";"):
+        trigrams = get_trigrams(query)
+        if trigrams and not REGEX_CHARACTERS & set(query):
+            # Only the names with all the trigrams of the query can contain it
+            postings = sorted((search_index["trigram_to_ids"].get(trigram, []) for trigram in trigrams), key=len)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = np.intersect1d(candidates, posting, assume_unique=True)
+        else:
+            candidates = range(len(names))
+        for name_id in candidates:
+            if not matches[name_id] and match_query(query, names[name_id]):
+                matches[name_id] = True
+    return matches
+
+
+def get_search_mask(search_index: dict, search_query: str, name_matches: np.ndarray, models: pd.Series) -> np.ndarray:
+    '''Get which rows of a "Model" column match a search query, given the result of `search_names` for it.'''
+    name_ids = models.map(search_index["model_to_id"]).to_numpy()
+    is_indexed = ~pd.isna(name_ids)
+    mask = np.zeros(len(models), dtype=bool)
+    mask[is_indexed] = name_matches[name_ids[is_indexed].astype(int)]
+    # Models missing from the index (e.g. tables that were not indexed) are matched one by one
+    for i in np.flatnonzero(~is_indexed):
+        name = get_model_name(models.iloc[i])
+        mask[i] = any(match_query(query, name) for query in search_query.lower().split(";"))
+    return mask
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# A snapshot of the leaderboard results is a folder with:
+# - tables-<hash>.arrow: every distinct table as an Arrow IPC stream, one after the other
+# - manifest.json: the byte range of each table in the tables file, keyed by the hash of its content, and the structure
+#   of the results (nested dicts, lists, texts and None), where tables are references to these hashes
+# Identical tables (e.g. the same task table in `all_data_tasks` and `boards_data`) are thus only stored once, and are
+# loaded as one DataFrame. Tables are memory-mapped on load, so only the manifest is parsed.
+SNAPSHOT_MANIFEST = "manifest.json"
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+def encode_column(values: pd.Series) -> tuple[pa.Array, str | None]:
+    '''
+    Convert a column to Arrow. The object columns of the leaderboard mix numbers with "" (missing scores) and
+    sometimes with strings (e.g. "N/A" max tokens), so they get an encoding to restore them exactly on load:
+    "blank" if the missing values are "", "json" if the values are of mixed types. Categorical columns (e.g. "Model")
+    are dictionary arrays.
+    '''
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return pa.array(values), None
+    if values.dtype != object:
+        return pa.array(values.to_numpy()), None
+
+    is_blank = (values == "").to_numpy()
+    kept = values[~is_blank]
+    encoding = "blank" if is_blank.any() else None
+    inferred_type = pd.api.types.infer_dtype(kept, skipna=False)
+    if inferred_type == "empty":
+        return pa.nulls(len(values), pa.string()), encoding
+    elif inferred_type == "string":
+        return pa.array(values.where(~is_blank, None).to_numpy(), type=pa.string()), encoding
+    elif inferred_type in ("integer", "floating", "mixed-integer-float"):
+        arrow_type = pa.int64() if inferred_type == "integer" else pa.float64()
+        numbers = values.where(~is_blank, 0).to_numpy().astype(arrow_type.to_pandas_dtype())
+        return pa.array(numbers, mask=is_blank, type=arrow_type), encoding
+    return pa.array([json.dumps(value) for value in values], type=pa.string()), "json"
+
+
+def decode_column(column: pa.ChunkedArray, encoding: str) -> np.ndarray:
+    if encoding == "json":
+        return np.array([json.loads(value) for value in column.to_pylist()] + [None], dtype=object)[:-1]
+    is_blank = column.is_null().to_numpy(zero_copy_only=False)
+    if pa.types.is_integer(column.type):
+        column = column.fill_null(0)
+    values = column.to_numpy(zero_copy_only=False).astype(object)
+    values[is_blank] = ""
+    return values
+
+
+def serialize_table(df: pd.DataFrame) -> tuple[pa.Buffer, dict]:
+    if "index" not in df.columns:
+        df = df.reset_index()
+    arrays, encodings = [], {}
+    for column in df.columns:
+        array, encoding = encode_column(df[column])
+        arrays.append(array)
+        if encoding is not None:
+            encodings[column] = encoding
+    table = pa.Table.from_arrays(arrays, names=[str(column) for column in df.columns])
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue(), encodings
+
+
+def write_snapshot(item: dict, path: str) -> None:
+    '''Write nested results (dicts, lists, DataFrames, strings and None, as for `write_out_results`) as a snapshot.'''
+    os.makedirs(path, exist_ok=True)
+    tmp_tables_path = os.path.join(path, f"tables.arrow.{os.getpid()}.tmp")
+    tables = {}
+    # Hash of the tables of the same DataFrame objects, which do not need to be serialized again
+    table_hashes = {}
+
+    with pa.OSFile(tmp_tables_path, "wb") as sink:
+
+        def write_table(df: pd.DataFrame) -> str:
+            if id(df) in table_hashes:
+                return table_hashes[id(df)]
+            buffer, encodings = serialize_table(df)
+            table_hash = hashlib.sha256(buffer).hexdigest()
+            # The encodings are part of the key, "" and null cannot be told apart from the Arrow data alone
+            table_hash = hashlib.sha256(f"{table_hash}{sorted(encodings.items())}".encode()).hexdigest()[:16]
+            if table_hash not in tables:
+                tables[table_hash] = {"offset": sink.tell(), "length": buffer.size, "encodings": encodings}
+                sink.write(buffer)
+            table_hashes[id(df)] = table_hash
+            return table_hash
+
+        def to_node(value):
+            if isinstance(value, dict):
+                return {"dict": {key: to_node(v) for key, v in value.items()}}
+            elif isinstance(value, list):
+                return {"list": [to_node(v) for v in value]}
+            elif isinstance(value, pd.DataFrame):
+                return {"table": write_table(value)}
+            elif isinstance(value, str):
+                return {"text": value}
+            elif value is None:
+                return None
+            raise Exception(f"Unknown type {type(value)}")
+
+        root = to_node(item)
+
+    # The tables file is named after its content, so that a reader never sees a manifest with the wrong tables file
+    tables_hash = hashlib.sha256("".join(tables).encode()).hexdigest()[:16]
+    tables_file = f"tables-{tables_hash}.arrow"
+    os.replace(tmp_tables_path, os.path.join(path, tables_file))
+
+    manifest = {"version": SNAPSHOT_FORMAT_VERSION, "tables_file": tables_file, "tables": tables, "root": root}
+    tmp_manifest_path = os.path.join(path, f"{SNAPSHOT_MANIFEST}.{os.getpid()}.tmp")
+    with open(tmp_manifest_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_manifest_path, os.path.join(path, SNAPSHOT_MANIFEST))
+
+    for file_name in os.listdir(path):
+        if file_name.startswith("tables-") and file_name.endswith(".arrow") and file_name != tables_file:
+            os.remove(os.path.join(path, file_name))
+
+
+def read_table(source: pa.MemoryMappedFile, table_info: dict) -> pd.DataFrame:
+    buffer = source.read_at(table_info["length"], table_info["offset"])
+    table = pa.ipc.open_stream(buffer).read_all()
+    encodings = table_info["encodings"]
+    columns = {}
+    for name, column in zip(table.column_names, table.columns):
+        if name in encodings:
+            columns[name] = decode_column(column, encodings[name])
+        elif pa.types.is_dictionary(column.type):
+            columns[name] = column.to_pandas().array
+        else:
+            # Numeric columns without null values (NaN is not null) are not copied
+            columns[name] = column.to_numpy(zero_copy_only=False)
+    index = pd.Index(columns.pop("index"), name="index")
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def load_snapshot(path: str) -> dict | list | pd.DataFrame | str | None:
+    '''Load the results written by `write_snapshot`, memory-mapping the tables file.'''
+    with open(os.path.join(path, SNAPSHOT_MANIFEST)) as f:
+        manifest = json.load(f)
+    if manifest["version"] != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot version {manifest['version']} in {path}")
+    source = pa.memory_map(os.path.join(path, manifest["tables_file"]), "r")
+    # Tables referenced several times are loaded once
+    loaded_tables = {}
+
+    def from_node(node):
+        if node is None:
+            return None
+        elif "dict" in node:
+            return {key: from_node(value) for key, value in node["dict"].items()}
+        elif "list" in node:
+            return [from_node(value) for value in node["list"]]
+        elif "table" in node:
+            if node["table"] not in loaded_tables:
+                loaded_tables[node["table"]] = read_table(source, manifest["tables"][node["table"]])
+            return loaded_tables[node["table"]]
+        return node["text"]
+
+    return from_node(manifest["root"])
+
+
+def snapshot_exists(path: str) -> bool:
+    return os.path.exists(os.path.join(path, SNAPSHOT_MANIFEST))
+
+
+def get_snapshot_version(path: str) -> str | None:
+    '''Get the version of a snapshot, the hash of the content of its tables, or None if there is no snapshot.'''
+    try:
+        with open(os.path.join(path, SNAPSHOT_MANIFEST)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    return manifest["tables_file"][len("tables-") : -len(".arrow")]
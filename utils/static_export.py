@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import html
+import json
+import os
+import re
+
+import pandas as pd
+
+from utils.table_api import encode_table, get_api_tables
+from utils.table_format import format_table
+
+# A static export of the leaderboard is a folder that any static file server or CDN can serve:
+# - <board>-<table>.<hash>.html and <board>-<table>.<hash>.json: every table of `boards_data`, in the order of
+#   `add_rank`. The names change with the content, so these files can be cached forever.
+# - index.html and index.json: the boards and the file names of their tables, to be served without caching.
+STATIC_INDEX = "index"
+# The files written by an export, the other files of the folder are left alone
+STATIC_FILE_PATTERN = re.compile(r"[^/]+-[^/]+\.[0-9a-f]{12}\.(html|json)")
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; font-size: 0.9em; }}
+th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: right; }}
+th {{ position: sticky; top: 0; background: #f5f5f5; }}
+td:nth-child(2) {{ text-align: left; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+{body}
+</body>
+</html>
+"""
+
+
+def get_file_name(name: str, content: bytes, extension: str) -> str:
+    content_hash = hashlib.sha256(content).hexdigest()[:12]
+    return f"{name}.{content_hash}.{extension}"
+
+
+def render_table_page(board: str, table_name: str, df: pd.DataFrame, json_file: str) -> bytes:
+    if "index" in df.columns:
+        df = df.drop(columns="index")
+    # The "Model" cells are HTML links
+    table = format_table(df).to_html(index=False, escape=False, border=0)
+    body = f'<p><a href="{STATIC_INDEX}.html">All boards</a> - <a href="{json_file}">JSON</a></p>\n{table}'
+    return PAGE_TEMPLATE.format(title=html.escape(f"MTEB {board} - {table_name}"), body=body).encode()
+
+
+def render_index_page(index: dict) -> bytes:
+    items = []
+    for board, tables in index.items():
+        links = ", ".join(
+            f'<a href="{files["html"]}">{html.escape(table_name)}</a> (<a href="{files["json"]}">JSON</a>)'
+            for table_name, files in tables.items()
+        )
+        items.append(f"<li><b>{html.escape(board)}</b>: {links}</li>")
+    return PAGE_TEMPLATE.format(title="MTEB Leaderboard", body="<ul>\n" + "\n".join(items) + "\n</ul>").encode()
+
+
+def write_file(path: str, content: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_static_export(boards_data: dict, path: str) -> None:
+    '''Pre-render every table of `boards_data` as static HTML and JSON files, with an index page.'''
+    os.makedirs(path, exist_ok=True)
+    index = {}
+    written_files = set()
+    for (board, table_name), df in get_api_tables(boards_data).items():
+        name = f"{board}-{table_name}"
+        table_json = encode_table(df, "json")
+        json_file = get_file_name(name, table_json, "json")
+        table_html = render_table_page(board, table_name, df, json_file)
+        html_file = get_file_name(name, table_html, "html")
+        for file_name, content in ((json_file, table_json), (html_file, table_html)):
+            # Unchanged tables keep their files
+            if not os.path.exists(os.path.join(path, file_name)):
+                write_file(os.path.join(path, file_name), content)
+            written_files.add(file_name)
+        index.setdefault(board, {})[table_name] = {"html": html_file, "json": json_file}
+
+    # The index is written last, it never references missing files
+    print(f"Saving the static export of {len(written_files) // 2} tables to {path}")
+    write_file(os.path.join(path, f"{STATIC_INDEX}.json"), json.dumps({"boards": index}, indent=2).encode())
+    write_file(os.path.join(path, f"{STATIC_INDEX}.html"), render_index_page(index))
+    written_files.update({f"{STATIC_INDEX}.json", f"{STATIC_INDEX}.html"})
+    for file_name in os.listdir(path):
+        if file_name not in written_files and STATIC_FILE_PATTERN.fullmatch(file_name):
+            os.remove(os.path.join(path, file_name))
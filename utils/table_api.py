@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import re
+
+import pandas as pd
+from fastapi import APIRouter, HTTPException, Request, Response
+
+from utils.table_format import format_table
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Read-only HTTP API of the leaderboard tables, with the hierarchy of `boards_data`:
+# - /api/boards: the boards and the URLs of their tables
+# - /api/boards/<board>/<table>.<format>: a table, where <table> is "overall" or a task category (e.g. "Retrieval")
+#   and <format> is "json" (a list of rows, missing scores are null) or "csv"
+#   The "Model" cells of the app are HTML links, the API has the plain model name and its URL in "Model Link".
+# Every response is encoded and compressed once, when the results are loaded, so a request only picks a blob.
+# The responses tell the version of the results they come from in the X-Results-Version header.
+API_FORMATS = {
+    "json": "application/json",
+    "csv": "text/csv; charset=utf-8",
+}
+# Content encodings in order of preference, brotli needs the optional `brotli` package
+API_ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+# See `make_clickable_model`
+MODEL_LINK_PATTERN = re.compile('<a .*?href="(.*?)".*?>(.+)</a>')
+
+
+def get_api_tables(boards_data: dict) -> dict:
+    '''Get the tables of `boards_data` keyed by board and table name.'''
+    tables = {}
+    for board, board_data in boards_data.items():
+        # Boards without overall table have None, loaded back as {"default.txt": None} from the legacy folders
+        if isinstance(board_data["data_overall"], pd.DataFrame):
+            tables[(board, "overall")] = board_data["data_overall"]
+        for task_category, df in board_data["data_tasks"].items():
+            tables[(board, task_category)] = df
+    return tables
+
+
+def split_model_links(df: pd.DataFrame) -> pd.DataFrame:
+    '''Replace the HTML links of the "Model" column by the model names, with their URLs in a "Model Link" column.'''
+    names = {}
+    links = {}
+    for model in df["Model"].unique():
+        match = MODEL_LINK_PATTERN.fullmatch(model)
+        names[model], links[model] = (match.group(2), match.group(1)) if match else (model, "")
+    df = df.copy()
+    position = df.columns.get_loc("Model")
+    df.insert(position + 1, "Model Link", df["Model"].map(links).astype(object))
+    df["Model"] = df["Model"].map(names).astype(object)
+    return df
+
+
+def encode_table(df: pd.DataFrame, api_format: str) -> bytes:
+    if "index" in df.columns:
+        df = df.drop(columns="index")
+    df = split_model_links(df)
+    # Rounded as in the app, with "" for the missing scores
+    df = format_table(df)
+    if api_format == "csv":
+        return df.to_csv(index=False).encode()
+    return df.astype(object).where(df != "", None).to_json(orient="records").encode()
+
+
+def make_blob(body: bytes, media_type: str) -> dict:
+    '''Compress a response body once, with a strong ETag per content encoding.'''
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    blob = {"media_type": media_type, "encodings": {"identity": (body, f'"{digest}"')}}
+    blob["encodings"]["gzip"] = (gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}-gzip"')
+    if brotli is not None:
+        blob["encodings"]["br"] = (brotli.compress(body, quality=9), f'"{digest}-br"')
+    return blob
+
+
+def build_api_blobs(boards_data: dict, version: str | None = None) -> dict:
+    '''Build the blobs of every response of the API, for a version of the results (see `get_snapshot_version`).'''
+    tables = get_api_tables(boards_data)
+    index = {}
+    blobs = {}
+    for (board, table_name), df in tables.items():
+        index.setdefault(board, {})[table_name] = {
+            api_format: f"/api/boards/{board}/{table_name}.{api_format}" for api_format in API_FORMATS
+        }
+        for api_format, media_type in API_FORMATS.items():
+            blobs[(board, table_name, api_format)] = make_blob(encode_table(df, api_format), media_type)
+    return {
+        "version": version,
+        "index": make_blob(json.dumps({"version": version, "boards": index}).encode(), API_FORMATS["json"]),
+        "tables": blobs,
+    }
+
+
+def get_accepted_encoding(accept_encoding: str) -> str:
+    '''Pick the preferred content encoding allowed by an Accept-Encoding header.'''
+    accepted = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip().lower()] = quality
+    for encoding in API_ENCODINGS:
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+
+def get_blob_response(blob: dict, request: Request, version: str | None) -> Response:
+    encoding = get_accepted_encoding(request.headers.get("accept-encoding", ""))
+    body, etag = blob["encodings"][encoding]
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "no-cache"}
+    if version is not None:
+        headers["X-Results-Version"] = version
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=blob["media_type"], headers=headers)
+
+
+def create_api_router(get_blobs) -> APIRouter:
+    '''
+    Create the routes of the API. `get_blobs` returns the current result of `build_api_blobs`, so that the served
+    results can be replaced without changing the routes.
+    '''
+    router = APIRouter(prefix="/api")
+
+    @router.get("/boards")
+    def get_boards(request: Request) -> Response:
+        blobs = get_blobs()
+        return get_blob_response(blobs["index"], request, blobs["version"])
+
+    @router.get("/boards/{board}/{table_file}")
+    def get_table(board: str, table_file: str, request: Request) -> Response:
+        table_name, _, api_format = table_file.rpartition(".")
+        # The blobs are replaced as a whole when new results are loaded
+        blobs = get_blobs()
+        blob = blobs["tables"].get((board, table_name, api_format))
+        if blob is None:
+            raise HTTPException(status_code=404, detail=f"No table {table_file} in board {board}")
+        return get_blob_response(blob, request, blobs["version"])
+
+    return router
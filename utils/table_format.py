@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# The leaderboard tables keep typed columns, in memory and in the snapshot: "Model" is categorical, "Rank" an integer,
+# the scores, averages and model sizes are float32 with NaN for the missing values, and "Max Tokens" (numbers or
+# "N/A") has NaN for the missing values. They are only formatted as the legacy tables, with rounded numbers and "" for
+# the missing values, when they are rendered or written out (see `format_table`).
+SCORE_DTYPE = "float32"
+SCORE_DECIMALS = 2
+# Columns of whole numbers, rendered without decimals
+INTEGER_COLUMNS = ["Rank", "Model Size (Million Parameters)", "Embedding Dimensions", "Max Tokens"]
+# Columns that are not converted to numbers
+UNTYPED_COLUMNS = ["index", "Rank", "Max Tokens"]
+
+
+def get_typed_table(df: pd.DataFrame) -> pd.DataFrame:
+    '''
+    Convert a table with "" for the missing values (e.g. before ranking, or loaded from the legacy folders or from an
+    older snapshot) to typed columns. A table that is typed already is returned as is.
+    '''
+    typed_columns = {}
+    for column in df.columns:
+        values = df[column]
+        if column == "Model":
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                typed_columns[column] = values.astype("category")
+        elif column in UNTYPED_COLUMNS:
+            if values.dtype == object and (values == "").any():
+                typed_columns[column] = values.where(values != "", np.nan)
+        elif values.dtype != SCORE_DTYPE:
+            if values.dtype == object:
+                values = pd.to_numeric(values.where(values != "", np.nan))
+            typed_columns[column] = values.astype(SCORE_DTYPE)
+    if not typed_columns:
+        return df
+    return pd.DataFrame({column: typed_columns.get(column, df[column]) for column in df.columns}, index=df.index, copy=False)
+
+
+def format_column(values: pd.Series, is_integer: bool) -> pd.Series:
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(object)
+    if values.dtype == object:
+        # "Max Tokens", numbers and "N/A"
+        is_number = values.map(lambda value: isinstance(value, float)).to_numpy()
+        if not is_number.any():
+            return values
+        numbers = values[is_number].to_numpy(dtype=np.float64)
+        formatted = values.to_numpy(copy=True)
+    elif pd.api.types.is_float_dtype(values.dtype):
+        is_number = np.ones(len(values), dtype=bool)
+        numbers = values.to_numpy(dtype=np.float64)
+        formatted = np.empty(len(values), dtype=object)
+    else:
+        return values
+    is_missing = np.isnan(numbers)
+    # As `DataFrame.round`, which gives the same rounded values from float32 scores as from the unrounded ones
+    numbers = numbers.round(0 if is_integer else SCORE_DECIMALS)
+    positions = np.flatnonzero(is_number)
+    formatted[positions[is_missing]] = ""
+    formatted[positions[~is_missing]] = numbers[~is_missing].astype(np.int64) if is_integer else numbers[~is_missing]
+    return pd.Series(formatted, index=values.index, name=values.name, dtype=object)
+
+
+def format_table(df: pd.DataFrame) -> pd.DataFrame:
+    '''Format a typed table as the legacy tables: numbers rounded, whole numbers as integers and "" for missing values.'''
+    return pd.DataFrame(
+        {column: format_column(df[column], column in INTEGER_COLUMNS) for column in df.columns}, index=df.index
+    )
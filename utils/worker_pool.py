@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Number of recent calls of a pool whose wait and run times are kept for the metrics
+METRICS_WINDOW = 1000
+
+
+def make_pool(name: str, workers: int) -> dict:
+    '''Create a pool of worker threads, which records how long the calls wait for a worker and run.'''
+    return {
+        "name": name,
+        "workers": workers,
+        "executor": ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name),
+        "lock": threading.Lock(),
+        "pending": 0,
+        "running": 0,
+        "completed": 0,
+        "failed": 0,
+        "wait_times": deque(maxlen=METRICS_WINDOW),
+        "run_times": deque(maxlen=METRICS_WINDOW),
+        # The same counts and times per handler (see `run_in_pool`)
+        "handlers": {},
+    }
+
+
+def make_handler_metrics() -> dict:
+    return {
+        "completed": 0,
+        "failed": 0,
+        "wait_times": deque(maxlen=METRICS_WINDOW),
+        "run_times": deque(maxlen=METRICS_WINDOW),
+    }
+
+
+async def run_in_pool(pool: dict, fn, *args, name: str | None = None):
+    '''
+    Run a function in a pool without blocking the event loop. The time it waits for a worker and runs is recorded for
+    the pool and for its handler `name` (the name of the function by default).
+    '''
+    name = name or getattr(fn, "__name__", "unknown")
+    submitted = time.perf_counter()
+    with pool["lock"]:
+        pool["pending"] += 1
+        handler = pool["handlers"].setdefault(name, make_handler_metrics())
+
+    def run():
+        started = time.perf_counter()
+        with pool["lock"]:
+            pool["pending"] -= 1
+            pool["running"] += 1
+            pool["wait_times"].append(started - submitted)
+            handler["wait_times"].append(started - submitted)
+        failed = True
+        try:
+            result = fn(*args)
+            failed = False
+            return result
+        finally:
+            run_time = time.perf_counter() - started
+            with pool["lock"]:
+                pool["running"] -= 1
+                pool["completed" if not failed else "failed"] += 1
+                pool["run_times"].append(run_time)
+                handler["completed" if not failed else "failed"] += 1
+                handler["run_times"].append(run_time)
+
+    return await asyncio.get_running_loop().run_in_executor(pool["executor"], run)
+
+
+def summarize_times(times: list) -> dict:
+    if not times:
+        return {"count": 0}
+    times = np.array(times)
+    return {
+        "count": len(times),
+        "mean_s": float(times.mean()),
+        "p50_s": float(np.percentile(times, 50)),
+        "p95_s": float(np.percentile(times, 95)),
+        "max_s": float(times.max()),
+    }
+
+
+def get_pool_metrics(pool: dict) -> dict:
+    with pool["lock"]:
+        wait_times, run_times = list(pool["wait_times"]), list(pool["run_times"])
+        counts = {key: pool[key] for key in ("workers", "pending", "running", "completed", "failed")}
+        handlers = {
+            name: (handler["completed"], handler["failed"], list(handler["wait_times"]), list(handler["run_times"]))
+            for name, handler in pool["handlers"].items()
+        }
+    return {
+        **counts,
+        # Only the wait for a thread of the pool, after the Gradio queue (see `track_queue_waits`)
+        "pool_wait": summarize_times(wait_times),
+        "run": summarize_times(run_times),
+        "handlers": {
+            name: {"completed": completed, "failed": failed, "pool_wait": summarize_times(waits), "run": summarize_times(runs)}
+            for name, (completed, failed, waits, runs) in handlers.items()
+        },
+    }
+
+
+def track_queue_waits(blocks) -> bool:
+    '''
+    Record how long the events of the Gradio queue of an app wait before a handler picks them, per concurrency group.
+    The events are stamped when they are pushed to the queue and measured when the queue takes them out, which wraps
+    `push` and `get_events` of the Gradio 4 queue. Returns False, without tracking anything, if they are not found.
+    '''
+    queue = getattr(blocks, "_queue", None)
+    push = getattr(queue, "push", None)
+    get_events = getattr(queue, "get_events", None)
+    event_queues = getattr(queue, "event_queue_per_concurrency_id", None)
+    if push is None or get_events is None or not isinstance(event_queues, dict):
+        return False
+    waits = {"lock": threading.Lock(), "wait_times": {}}
+
+    async def push_stamped(*args, **kwargs):
+        result = await push(*args, **kwargs)
+        pushed = time.perf_counter()
+        success, event_id = result
+        if success:
+            # The event was appended to the queue of its group without yielding to the event loop
+            for event_queue in event_queues.values():
+                for event in reversed(getattr(event_queue, "queue", [])):
+                    if getattr(event, "_id", None) == event_id:
+                        event.pushed_time = pushed
+                        break
+        return result
+
+    def get_events_timed():
+        event_batch = get_events()
+        if event_batch:
+            taken = time.perf_counter()
+            events, _, concurrency_id = event_batch
+            with waits["lock"]:
+                wait_times = waits["wait_times"].setdefault(concurrency_id, deque(maxlen=METRICS_WINDOW))
+                for event in events:
+                    pushed = getattr(event, "pushed_time", None)
+                    if pushed is not None:
+                        wait_times.append(taken - pushed)
+        return event_batch
+
+    queue.push = push_stamped
+    queue.get_events = get_events_timed
+    queue.wait_metrics = waits
+    return True
+
+
+def get_queue_metrics(blocks) -> dict:
+    '''
+    Get the state of the Gradio queue of an app: the events waiting and running per concurrency group, how long they
+    waited in the queue (see `track_queue_waits`), and the average processing time of every event handler. This reads
+    the internals of the Gradio 4 queue: whatever is not found (e.g. with another version of Gradio) is left out and
+    listed in "unavailable", instead of failing. The filter handlers also record their run times and their wait for a
+    thread of their pool (see `get_pool_metrics`).
+    '''
+    metrics = {"unavailable": []}
+    queue = getattr(blocks, "_queue", None)
+    if queue is None:
+        metrics["unavailable"].append("queue")
+        return metrics
+
+    event_queues = getattr(queue, "event_queue_per_concurrency_id", None)
+    if isinstance(event_queues, dict):
+        groups = {}
+        for concurrency_id, event_queue in event_queues.items():
+            waiting = getattr(event_queue, "queue", None)
+            groups[concurrency_id] = {
+                "waiting": len(waiting) if waiting is not None else None,
+                "running": getattr(event_queue, "current_concurrency", None),
+                "limit": getattr(event_queue, "concurrency_limit", None),
+            }
+        metrics["groups"] = groups
+        metrics["waiting"] = sum(group["waiting"] or 0 for group in groups.values())
+    else:
+        metrics["unavailable"].append("groups")
+    metrics["max_size"] = getattr(queue, "max_size", None)
+
+    waits = getattr(queue, "wait_metrics", None)
+    if waits is not None:
+        with waits["lock"]:
+            wait_times = {concurrency_id: list(times) for concurrency_id, times in waits["wait_times"].items()}
+        metrics["wait"] = {concurrency_id: summarize_times(times) for concurrency_id, times in wait_times.items()}
+    else:
+        metrics["unavailable"].append("wait")
+
+    process_times = getattr(queue, "process_time_per_fn_index", None)
+    if isinstance(process_times, dict):
+        fns = getattr(blocks, "fns", None)
+        handlers = {}
+        for fn_index, process_time in process_times.items():
+            try:
+                fn = fns[fn_index].fn
+            except (TypeError, IndexError, KeyError, AttributeError):
+                fn = None
+            name = getattr(fn, "__name__", str(fn_index)) if fn is not None else str(fn_index)
+            handlers[f"{fn_index}:{name}"] = {
+                "count": getattr(process_time, "count", None),
+                "mean_s": getattr(process_time, "avg_time", None),
+            }
+        metrics["handlers"] = handlers
+    else:
+        metrics["unavailable"].append("handlers")
+    return metrics